@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolated_cache(django_test_environment):
+    """Keep the tests off the cache file shared by the running site."""
+    from core.testing import isolated_cache
+
+    with isolated_cache():
+        yield
@@ -0,0 +1,64 @@
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite set up for many concurrent requests.
+
+    ``OPTIONS`` take two keys besides those of ``sqlite3.connect``:
+    ``pragmas``, run on every new connection, and ``transaction_mode``.
+    With ``IMMEDIATE`` atomic blocks take the write lock at ``BEGIN`` and
+    wait for it, rather than failing with "database is locked" when a
+    read transaction has to become a write one.
+
+    ``CONN_HEALTH_CHECKS`` makes a persistent connection prove it still
+    works before its first query of every request.
+    """
+
+    health_check_enabled = False
+    health_check_done = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        self.health_check_enabled = self.settings_dict.get(
+            'CONN_HEALTH_CHECKS', False
+        )
+        self.health_check_done = True
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+
+    def is_usable(self):
+        try:
+            self.connection.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Called at the start and end of every request.
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if (self.connection is not None and self.health_check_enabled
+                and not self.health_check_done and not self.in_atomic_block):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
@@ -0,0 +1,275 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats SET entries = entries - 1, bytes = bytes - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache
+BEGIN
+    UPDATE cache_stats SET bytes = bytes + NEW.size - OLD.size;
+END;
+'''
+# Rows beyond either cap, oldest access first, until enough are freed.
+CULL = '''
+DELETE FROM cache WHERE key IN (
+    SELECT key FROM (
+        SELECT key, size,
+            SUM(size) OVER oldest AS freed,
+            ROW_NUMBER() OVER oldest AS number
+        FROM cache
+        WINDOW oldest AS (ORDER BY accessed ROWS UNBOUNDED PRECEDING)
+    ) WHERE freed - size < ? OR number <= ?
+)
+'''
+
+
+class SQLiteCache(BaseCache):
+    """A cache in a SQLite file in WAL mode, shared by all processes.
+
+    ``LOCATION`` is the path of the file. Besides ``MAX_ENTRIES`` and
+    ``CULL_FREQUENCY`` the options take ``MAX_BYTES``, a cap on the size
+    of the stored values. Going over either cap removes expired entries
+    and then the least recently read ones, ``1 / CULL_FREQUENCY`` of the
+    cap at a time. Reads refresh the access time of an entry at most
+    once every ``ACCESS_RESOLUTION`` seconds, so hot keys do not turn
+    every read into a write.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.max_bytes = int(options.get('MAX_BYTES', 64 * 1024 * 1024))
+        self.access_resolution = float(options.get('ACCESS_RESOLUTION', 10))
+        self.busy_timeout = int(options.get('BUSY_TIMEOUT', 5000))
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        db = getattr(self._local, 'db', None)
+        # A connection opened before a fork must not be used by the child.
+        if db is None or self._local.pid != os.getpid():
+            db = self._local.db = self._connect()
+            self._local.pid = os.getpid()
+        return db
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(
+            self.path, timeout=self.busy_timeout / 1000,
+            isolation_level=None, check_same_thread=False,
+        )
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute(f'PRAGMA busy_timeout={self.busy_timeout}')
+        db.executescript('BEGIN IMMEDIATE;' + SCHEMA + 'COMMIT;')
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        """A write transaction holding the lock from the start."""
+        db = self.db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _dump(value):
+        # Integers, like the page cache versions, are stored unpickled.
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    @staticmethod
+    def _size(value):
+        return 8 if isinstance(value, int) else len(value)
+
+    def _read(self, keys):
+        """Stored values of the live ``keys``, refreshing their LRU stamp."""
+        now = time.time()
+        rows = self.db.execute(
+            'SELECT key, value, accessed FROM cache WHERE key IN ({}) '
+            'AND (expires IS NULL OR expires > ?)'.format(
+                ','.join('?' * len(keys))
+            ), (*keys, now),
+        ).fetchall()
+        stale = [
+            (now, key) for key, value, accessed in rows
+            if accessed < now - self.access_resolution
+        ]
+        if stale:
+            with self._transaction() as db:
+                db.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?', stale
+                )
+        return {key: self._load(value) for key, value, accessed in rows}
+
+    def _write(self, db, items, timeout, replace=True):
+        """Store ``items``; without ``replace`` live entries are kept."""
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (key, value, expires, now, self._size(value))
+            for key, value in ((key, self._dump(value))
+                               for key, value in items)
+        ]
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete
+        # would not fire the trigger keeping cache_stats right.
+        sql = (
+            'INSERT INTO cache VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+            'expires = excluded.expires, accessed = excluded.accessed, '
+            'size = excluded.size'
+        )
+        if replace:
+            db.executemany(sql, rows)
+            written = len(rows)
+        else:
+            written = 0
+            for row in rows:
+                written += db.execute(
+                    sql + ' WHERE expires IS NOT NULL AND expires <= ?',
+                    (*row, now),
+                ).rowcount
+        self._cull(db, now)
+        return written
+
+    def _cull(self, db, now):
+        entries, size = db.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self.max_bytes:
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+        entries, size = db.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self.max_bytes:
+            return
+        cull = max(self._cull_frequency, 1)
+        db.execute(CULL, (
+            size - self.max_bytes * (cull - 1) // cull,
+            entries - self._max_entries * (cull - 1) // cull,
+        ))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            return bool(self._write(db, [(key, value)], timeout, False))
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._read([key]).get(key, default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            self._write(db, [(key, value)], timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            return bool(db.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            ).rowcount)
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self.db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)', (key, time.time()),
+        ).fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)', (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = self._load(row[0]) + delta
+            stored = self._dump(value)
+            db.execute(
+                'UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                (stored, self._size(stored), key),
+            )
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        return {
+            keys[key]: value for key, value in self._read(list(keys)).items()
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = [
+            (self._key(key, version), value) for key, value in data.items()
+        ]
+        with self._transaction() as db:
+            self._write(db, items, timeout)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [(self._key(key, version),) for key in keys]
+        with self._transaction() as db:
+            db.executemany('DELETE FROM cache WHERE key = ?', keys)
+
+    def clear(self):
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests.
+        pass
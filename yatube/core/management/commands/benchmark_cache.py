@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'sqlite': 'core.cache.SQLiteCache',
+}
+MANY = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the shared SQLite cache with LocMemCache and the file '
+        'based cache: operations per second of get, get_many, set, '
+        'set_many and incr from one or more threads. LocMemCache is '
+        'fastest but private to each process; the others are shared.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backends', default=','.join(BACKENDS),
+            help='Comma separated names out of ' + ', '.join(BACKENDS),
+        )
+        parser.add_argument('--keys', type=int, default=1000)
+        parser.add_argument('--operations', type=int, default=1000)
+        parser.add_argument('--threads', type=int, default=1)
+        parser.add_argument('--value-size', type=int, default=2000)
+        parser.add_argument('--output', help='Write the JSON here.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        results = []
+        directory = tempfile.mkdtemp()
+        try:
+            for name in options['backends'].split(','):
+                location = os.path.join(directory, name)
+                cache = import_string(BACKENDS[name])(location, {
+                    'TIMEOUT': None,
+                    'OPTIONS': {'MAX_ENTRIES': options['keys'] * 2},
+                })
+                for operation, ops in self.measure(cache):
+                    results.append({
+                        'backend': name, 'operation': operation,
+                        'ops_per_second': round(ops),
+                    })
+                    self.stderr.write(f'{name:<7} {operation:<9} {ops:.0f}/s')
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        report = json.dumps({'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def measure(self, cache):
+        keys = [f'key:{number}' for number in range(self.options['keys'])]
+        value = {'html': 'x' * self.options['value_size']}
+        cache.set_many({key: value for key in keys})
+        cache.set('counter', 0)
+        batches = [keys[i:i + MANY] for i in range(0, len(keys), MANY)]
+        operations = {
+            'get': lambda i: cache.get(keys[i % len(keys)]),
+            'get_many': lambda i: cache.get_many(batches[i % len(batches)]),
+            'set': lambda i: cache.set(keys[i % len(keys)], value),
+            'set_many': lambda i: cache.set_many(
+                dict.fromkeys(batches[i % len(batches)], value)
+            ),
+            'incr': lambda i: cache.incr('counter'),
+        }
+        for name, operation in operations.items():
+            yield name, self.run(operation)
+
+    def run(self, operation):
+        threads = self.options['threads']
+        count = self.options['operations']
+
+        def work(offset):
+            for i in range(offset, count, threads):
+                operation(i)
+
+        workers = [
+            threading.Thread(target=work, args=(offset,))
+            for offset in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return count / (time.perf_counter() - started)
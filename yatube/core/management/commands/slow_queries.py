@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import slowlog
+
+ORDERS = {
+    'total': lambda group: group['total_ms'],
+    'max': lambda group: group['max_ms'],
+    'count': lambda group: group['count'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize the slow query log: statements are grouped by their '
+        'shape with literals and placeholders removed, and the worst '
+        'shapes are printed with the views that ran them and the plan of '
+        'their slowest run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=settings.SLOW_QUERY_LOG,
+            help='Log file; its rotated backups are read too.',
+        )
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--order', choices=ORDERS, default='total')
+
+    def handle(self, *args, **options):
+        groups = defaultdict(lambda: {
+            'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': set(),
+            'slowest': None,
+        })
+        for entry in slowlog.read(options['log']):
+            group = groups[slowlog.shape(entry['sql'])]
+            group['count'] += 1
+            group['total_ms'] += entry['ms']
+            group['views'].add(entry['view'] or '-')
+            if entry['ms'] >= group['max_ms']:
+                group['max_ms'] = entry['ms']
+                group['slowest'] = entry
+        if not groups:
+            self.stdout.write('No slow queries logged.')
+            return
+        worst = sorted(
+            groups.items(), key=lambda item: ORDERS[options['order']](
+                item[1]
+            ), reverse=True,
+        )[:options['limit']]
+        for shape, group in worst:
+            self.stdout.write(
+                f'{group["count"]} runs, {group["total_ms"]:.1f}ms total, '
+                f'{group["max_ms"]:.1f}ms max, '
+                f'{group["total_ms"] / group["count"]:.1f}ms mean; '
+                f'views: {", ".join(sorted(group["views"]))}'
+            )
+            self.stdout.write(f'    {shape}')
+            for detail in group['slowest']['plan'] or []:
+                self.stdout.write(f'    | {detail}')
@@ -0,0 +1,187 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template.backends.django import Template
+
+from . import slowlog
+
+# Upper bounds of the histogram buckets; +Inf is implied.
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_local = threading.local()
+
+
+class Histogram:
+    """A Prometheus histogram with one series per view name."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, view, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(view)
+            if series is None:
+                series = self.series[view] = [
+                    [0] * (len(self.buckets) + 1), 0, 0
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def lines(self):
+        with self.lock:
+            series = {
+                view: (list(counts), total, count)
+                for view, (counts, total, count) in self.series.items()
+            }
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for view, (counts, total, count) in sorted(series.items()):
+            label = 'view="{}"'.format(
+                view.replace('\\', r'\\').replace('"', r'\"')
+            )
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket
+                yield (
+                    f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            yield f'{self.name}_sum{{{label}}} {total}'
+            yield f'{self.name}_count{{{label}}} {count}'
+
+
+REQUEST_SECONDS = Histogram(
+    'yatube_request_duration_seconds',
+    'Time from the request reaching Django to the response leaving it.',
+    SECONDS_BUCKETS,
+)
+SQL_SECONDS = Histogram(
+    'yatube_request_sql_seconds',
+    'Time spent in SQL queries per request.',
+    SECONDS_BUCKETS,
+)
+RENDER_SECONDS = Histogram(
+    'yatube_request_render_seconds',
+    'Time spent rendering templates per request, SQL included.',
+    SECONDS_BUCKETS,
+)
+QUERIES = Histogram(
+    'yatube_request_queries',
+    'SQL queries per request.',
+    QUERY_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, SQL_SECONDS, RENDER_SECONDS, QUERIES)
+
+
+class Timings:
+    """What the current request spent on SQL and rendering.
+
+    Statements slower than ``SLOW_QUERY_SECONDS`` go to the slow query
+    log along with the view that ran them.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.slow_seconds = settings.SLOW_QUERY_SECONDS
+        self.queries = 0
+        self.sql = 0.0
+        self.render = 0.0
+        self.depth = 0
+        self.explaining = False
+
+    def execute(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql += elapsed
+            self.queries += 1
+        if self.slow_seconds is not None and elapsed >= self.slow_seconds:
+            self.explaining = True
+            try:
+                slowlog.record(
+                    context['connection'], self.view_name(), sql, params,
+                    many, elapsed,
+                )
+            finally:
+                self.explaining = False
+        return result
+
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        if match is not None:
+            return match.view_name
+        return getattr(self.request, 'path', None)
+
+
+def _timed_render(render):
+    def timed(self, *args, **kwargs):
+        timings = getattr(_local, 'timings', None)
+        if timings is None:
+            return render(self, *args, **kwargs)
+        # Templates rendered from inside a template, like cached post
+        # cards, are part of the outer render already.
+        timings.depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timings.depth -= 1
+            if not timings.depth:
+                timings.render += time.perf_counter() - started
+    timed.untimed = render
+    return timed
+
+
+def instrument_templates():
+    """Time template renders of the requests being measured."""
+    if not hasattr(Template.render, 'untimed'):
+        Template.render = _timed_render(Template.render)
+
+
+@contextmanager
+def measure(connection, request=None):
+    """Collect the timings of the code inside into a ``Timings``."""
+    timings = _local.timings = Timings(request)
+    try:
+        with connection.execute_wrapper(timings.execute):
+            yield timings
+    finally:
+        _local.timings = None
+
+
+def observe(view, elapsed, timings):
+    REQUEST_SECONDS.observe(view, elapsed)
+    SQL_SECONDS.observe(view, timings.sql)
+    RENDER_SECONDS.observe(view, timings.render)
+    QUERIES.observe(view, timings.queries)
+
+
+def exposition():
+    """All histograms in the Prometheus text format."""
+    lines = [line for histogram in HISTOGRAMS for line in histogram.lines()]
+    return '\n'.join(lines) + '\n'
+
+
+def clear():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
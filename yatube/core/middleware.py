@@ -0,0 +1,28 @@
+import time
+
+from django.db import connection
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """Time every request by URL name for the ``/metrics`` endpoint.
+
+    The histograms live in the process, so every worker of a
+    multi-process server exports its own series.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with metrics.measure(connection, request) as timings:
+            response = self.get_response(request)
+        match = request.resolver_match
+        metrics.observe(
+            match.view_name if match else 'unresolved',
+            time.perf_counter() - started, timings,
+        )
+        return response
@@ -0,0 +1,116 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+LISTS = re.compile(r'\?(?:\s*,\s*\?)+')
+SPACES = re.compile(r'\s+')
+
+logger = logging.getLogger('yatube.slow_queries')
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+_listener = None
+_lock = threading.Lock()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread, dropping them when it lags."""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start():
+    """Start the background writer of the slow query log."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        path = settings.SLOW_QUERY_LOG
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=settings.SLOW_QUERY_LOG_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS, encoding='utf-8',
+            delay=True,
+        )
+        records = queue.Queue(settings.SLOW_QUERY_QUEUE_SIZE)
+        _listener = QueueListener(records, handler)
+        _listener.start()
+        logger.addHandler(DroppingQueueHandler(records))
+
+
+@atexit.register
+def stop():
+    """Write out the queued records and stop the writer."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        _listener = None
+
+
+def explain(connection, sql, params):
+    if connection.vendor != 'sqlite' or not sql.lstrip().upper().startswith(
+        ('SELECT', 'WITH')
+    ):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+    except DatabaseError as error:
+        return [f'EXPLAIN failed: {error}']
+
+
+def record(connection, view, sql, params, many, elapsed):
+    """Queue a slow statement with its plan for the writer thread."""
+    start()
+    logger.info(json.dumps({
+        'time': timezone.now().isoformat(),
+        'view': view,
+        'ms': round(elapsed * 1000, 2),
+        'sql': sql,
+        'params': params,
+        'plan': None if many else explain(connection, sql, params),
+    }, ensure_ascii=False, default=str))
+
+
+def shape(sql):
+    """The statement with its literals and placeholders replaced by ``?``."""
+    sql = LITERALS.sub('?', sql)
+    return SPACES.sub(' ', LISTS.sub('?, ...', sql)).strip()
+
+
+def read(path):
+    """Entries of the log and its rotated backups, oldest first."""
+    paths = [path] + [
+        f'{path}.{number}'
+        for number in range(1, settings.SLOW_QUERY_LOG_BACKUPS + 1)
+    ]
+    for name in reversed(paths):
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as log:
+            for line in log:
+                if line.strip():
+                    yield json.loads(line)
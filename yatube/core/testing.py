@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def isolated_cache():
+    """Point the default cache at a new, empty file for the code inside.
+
+    The test databases get a cache of their own this way, so clearing or
+    filling it never touches the cache shared by the running site, and no
+    run starts from what an earlier one left behind.
+    """
+    directory = tempfile.mkdtemp(prefix='yatube-cache-')
+    try:
+        with override_settings(CACHES={'default': {
+            **settings.CACHES['default'],
+            'LOCATION': os.path.join(directory, 'default.sqlite3'),
+        }}):
+            yield
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    """The default runner, with the tests on an :func:`isolated_cache`."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache = isolated_cache()
+        self._cache.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
@@ -1,6 +1,26 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
 from http import HTTPStatus
+from io import StringIO
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import metrics, slowlog
+from core.backends.sqlite3.base import DatabaseWrapper
+from core.cache import SQLiteCache
+from yatube import settings_production
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -8,3 +28,306 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.clear()
+
+    def test_requests_are_measured_by_url_name(self):
+        self.client.get(reverse('posts:gen'))
+        self.client.get(reverse('posts:gen'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        for name in (
+            'yatube_request_duration_seconds', 'yatube_request_sql_seconds',
+            'yatube_request_render_seconds', 'yatube_request_queries',
+        ):
+            with self.subTest(name=name):
+                self.assertIn(f'# TYPE {name} histogram', text)
+                self.assertIn(f'{name}_count{{view="posts:gen"}} 2', text)
+                self.assertIn(
+                    f'{name}_bucket{{view="posts:gen",le="+Inf"}} 2', text
+                )
+
+    def test_queries_and_renders_are_counted(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:gen'))
+        series = metrics.QUERIES.series['posts:gen']
+        self.assertEqual(series[1], len(queries))
+        self.assertGreater(metrics.RENDER_SECONDS.series['posts:gen'][1], 0)
+
+    def test_unresolved_requests(self):
+        self.client.get('/nonexist-page/')
+        self.assertIn('unresolved', metrics.REQUEST_SECONDS.series)
+
+    def test_metrics_are_private(self):
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='203.0.113.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.clear()
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, 'slow', 'queries.log')
+        self.settings = override_settings(
+            SLOW_QUERY_SECONDS=0, SLOW_QUERY_LOG=self.log
+        )
+        self.settings.enable()
+
+    def tearDown(self):
+        slowlog.stop()
+        self.settings.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_slow_queries_are_logged_with_plan(self):
+        user = User.objects.create_user(username='auth')
+        self.client.get(reverse('posts:profile', args=[user.username]))
+        slowlog.stop()
+        entries = list(slowlog.read(self.log))
+        self.assertTrue(entries)
+        self.assertEqual(
+            {entry['view'] for entry in entries}, {'posts:profile'}
+        )
+        selects = [
+            entry for entry in entries if entry['sql'].startswith('SELECT')
+        ]
+        self.assertIn('auth', selects[0]['params'])
+        self.assertTrue(all(entry['plan'] for entry in selects))
+
+    def test_explain_is_not_measured(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:gen'))
+        explains = [
+            query for query in queries
+            if query['sql'].startswith('EXPLAIN')
+        ]
+        self.assertTrue(explains)
+        self.assertEqual(
+            metrics.QUERIES.series['posts:gen'][1],
+            len(queries) - len(explains),
+        )
+
+    @override_settings(SLOW_QUERY_SECONDS=None)
+    def test_disabled(self):
+        self.client.get(reverse('posts:gen'))
+        slowlog.stop()
+        self.assertFalse(os.path.exists(self.log))
+
+    def test_shape(self):
+        self.assertEqual(
+            slowlog.shape(
+                "SELECT * FROM t WHERE id IN (%s, %s, %s) AND a = 'x''y'\n"
+                '  LIMIT 21'
+            ),
+            'SELECT * FROM t WHERE id IN (?, ...) AND a = ? LIMIT ?',
+        )
+
+    def test_summary_command(self):
+        os.makedirs(os.path.dirname(self.log))
+        with open(self.log, 'w') as log:
+            for view, ms, sql in (
+                ('posts:gen', 5, 'SELECT a FROM t WHERE id = %s'),
+                ('posts:profile', 50, 'SELECT a FROM t WHERE id = %s'),
+                ('posts:gen', 20, 'SELECT b FROM u LIMIT 21'),
+            ):
+                log.write(json.dumps({
+                    'view': view, 'ms': ms, 'sql': sql, 'params': [],
+                    'plan': ['SCAN u'],
+                }) + '\n')
+        out = StringIO()
+        call_command('slow_queries', log=self.log, limit=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('2 runs, 55.0ms total, 50.0ms max', output)
+        self.assertIn('views: posts:gen, posts:profile', output)
+        self.assertIn('SELECT a FROM t WHERE id = ?', output)
+        self.assertNotIn('FROM u', output)
+
+
+class SQLiteCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.path, {'OPTIONS': options})
+
+    def test_get_set_delete(self):
+        self.cache.set('key', {'a': [1, 2]})
+        self.assertEqual(self.cache.get('key'), {'a': [1, 2]})
+        self.assertTrue(self.cache.has_key('key'))
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.get('key', 'default'), 'default')
+
+    def test_add_keeps_live_values(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+        self.cache.set('key', 'expired', 0)
+        self.assertTrue(self.cache.add('key', 'third'))
+        self.assertEqual(self.cache.get('key'), 'third')
+
+    def test_timeouts(self):
+        self.cache.set('forever', 1, None)
+        self.cache.set('expired', 1, 0)
+        self.assertEqual(self.cache.get('forever'), 1)
+        self.assertIsNone(self.cache.get('expired'))
+        self.assertFalse(self.cache.touch('expired'))
+        self.assertTrue(self.cache.touch('forever', 0))
+        self.assertIsNone(self.cache.get('forever'))
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.decr('counter', 5), -3)
+        self.assertEqual(self.cache.get('counter'), -3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_incr_is_atomic(self):
+        self.cache.set('counter', 0)
+
+        def count():
+            for _ in range(50):
+                self.cache.incr('counter')
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+
+    def test_many(self):
+        self.cache.set_many({'a': 1, 'b': 'два', 'c': None})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c', 'd']),
+            {'a': 1, 'b': 'два', 'c': None},
+        )
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': None})
+
+    def test_shared_between_processes(self):
+        other = self.make_cache()
+        self.cache.set('key', 'value')
+        self.assertEqual(other.get('key'), 'value')
+        other.incr_version('key')
+        self.assertIsNone(self.cache.get('key'))
+        other.clear()
+        self.assertFalse(self.cache.has_key('key', version=2))
+
+    def test_least_recently_read_are_evicted(self):
+        cache = self.make_cache(
+            MAX_ENTRIES=4, CULL_FREQUENCY=2, ACCESS_RESOLUTION=0
+        )
+        for key in 'abcd':
+            cache.set(key, key)
+        cache.get('a')
+        cache.set('e', 'e')
+        self.assertEqual(
+            sorted(cache.get_many('abcde')), ['a', 'e']
+        )
+
+    def test_size_cap(self):
+        cache = self.make_cache(MAX_BYTES=10000, CULL_FREQUENCY=2)
+        for number in range(20):
+            cache.set(number, 'x' * 1000)
+        stored = cache.db.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone()
+        self.assertLessEqual(stored[1], 10000)
+        self.assertEqual(stored[0], len(cache.get_many(range(20))))
+        self.assertIn(19, cache.get_many(range(20)))
+
+    def test_stats_follow_overwrites(self):
+        self.cache.set('key', 'x' * 100)
+        self.cache.set('key', 'x' * 10)
+        self.cache.set_many({'key': 1, 'other': 2})
+        self.cache.delete('other')
+        self.assertEqual(self.cache.db.execute(
+            'SELECT entries, bytes FROM cache_stats'
+        ).fetchone(), (1, 8))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'benchmark_cache', keys=20, operations=40, threads=2,
+            stdout=out, stderr=StringIO(),
+        )
+        results = json.loads(out.getvalue())['results']
+        self.assertEqual(
+            {(row['backend'], row['operation']) for row in results},
+            {(backend, operation)
+             for backend in ('locmem', 'file', 'sqlite')
+             for operation in ('get', 'get_many', 'set', 'set_many', 'incr')},
+        )
+
+
+class ProductionDatabaseTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'db.sqlite3')
+        database = settings_production.DATABASES['default']
+        self.wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            **database,
+            'NAME': self.path,
+            'OPTIONS': {**database['OPTIONS'], 'timeout': 0},
+        }, alias='production')
+
+    def tearDown(self):
+        self.wrapper.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma('foreign_keys'), 1)
+
+    def test_transactions_take_the_write_lock(self):
+        self.wrapper.ensure_connection()
+        self.wrapper._start_transaction_under_autocommit()
+        other = sqlite3.connect(self.path, timeout=0)
+        try:
+            with self.assertRaisesMessage(
+                sqlite3.OperationalError, 'database is locked'
+            ):
+                other.execute('BEGIN IMMEDIATE')
+        finally:
+            other.close()
+            self.wrapper.connection.execute('ROLLBACK')
+
+    def test_broken_connection_is_replaced(self):
+        self.wrapper.ensure_connection()
+        broken = self.wrapper.connection
+        # The next request starts with a connection that no longer works.
+        self.wrapper.close_if_unusable_or_obsolete()
+        broken.close()
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertIsNot(self.wrapper.connection, broken)
+
+    def test_healthy_connection_is_kept(self):
+        self.wrapper.ensure_connection()
+        kept = self.wrapper.connection
+        self.wrapper.close_if_unusable_or_obsolete()
+        self.pragma('journal_mode')
+        self.assertIs(self.wrapper.connection, kept)
@@ -0,0 +1,215 @@
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+
+from .cache import get_versions, post_modified
+from .feed import feed_paginator
+from .models import Group, Post, User
+from .paginators import MAX_KEY, CursorPaginator
+from .utils import POSTS_PER_PAGE, comments_paginator
+
+MAX_LIMIT = 100
+POST_FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'updated_at': lambda post: post.updated_at.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group_id else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.pk,
+    'author': lambda comment: comment.author.username,
+    'text': lambda comment: comment.text,
+    'created': lambda comment: comment.created.isoformat(),
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+
+def scope_etag(*scopes):
+    """ETag of a public response that changes with the page cache scopes.
+
+    Lists add the ``comments`` scope, bumped by every comment, since
+    they show ``comments_count``.
+    """
+    def etag(request, **kwargs):
+        versions = get_versions(*(scope.format(**kwargs) for scope in scopes))
+        return md5('{}:{}'.format(
+            request.get_full_path(), ':'.join(map(str, versions))
+        ).encode()).hexdigest()
+    return etag
+
+
+def post_etag(request, post_id):
+    modified = post_modified(post_id)
+    if modified is None:
+        return None
+    return md5(
+        f'{request.get_full_path()}:{modified.isoformat()}'.encode()
+    ).hexdigest()
+
+
+def api_view(etag_func=None, private=False):
+    """Read-only JSON endpoint.
+
+    Errors come back as ``{"detail": ...}``. Public responses may be
+    cached for ``API_CACHE_SECONDS`` and revalidated with ``etag_func``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if private and not request.user.is_authenticated:
+                return json_response(
+                    {'detail': 'Authentication required.'}, 401
+                )
+            try:
+                response = view(request, *args, **kwargs)
+            except BadRequest as error:
+                return json_response({'detail': str(error)}, 400)
+            except Http404:
+                return json_response({'detail': 'Not found.'}, 404)
+            if private:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(
+                    response, public=True,
+                    max_age=settings.API_CACHE_SECONDS,
+                )
+            return response
+        if etag_func is not None:
+            wrapper = condition(etag_func=etag_func)(wrapper)
+        return require_GET(wrapper)
+    return decorator
+
+
+def get_fields(request, serializers):
+    """Serializers of the fields asked for with ``?fields=a,b``."""
+    names = request.GET.get('fields')
+    if not names:
+        return serializers
+    fields = {}
+    for name in names.split(','):
+        if name not in serializers:
+            raise BadRequest(f'Unknown field: {name}')
+        fields[name] = serializers[name]
+    return fields
+
+
+def serialize(obj, fields):
+    return {name: field(obj) for name, field in fields.items()}
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POSTS_PER_PAGE))
+    except ValueError:
+        raise BadRequest('limit must be a number')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f'limit must be between 1 and {MAX_LIMIT}')
+    return limit
+
+
+def page_response(request, paginator, serializers):
+    fields = get_fields(request, serializers)
+    page = paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    return json_response({
+        'results': [serialize(obj, fields) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+def posts_response(request, posts):
+    posts = posts.select_related('author', 'group')
+    ids = request.GET.get('ids')
+    if ids is None:
+        return page_response(
+            request, CursorPaginator(posts, get_limit(request)), POST_FIELDS
+        )
+    try:
+        ids = [int(pk) for pk in ids.split(',')]
+    except ValueError:
+        raise BadRequest('ids must be numbers')
+    if len(ids) > MAX_LIMIT:
+        raise BadRequest(f'At most {MAX_LIMIT} ids at once')
+    if any(abs(pk) > MAX_KEY for pk in ids):
+        raise BadRequest('ids must fit 64 bits')
+    found = posts.in_bulk(ids)
+    fields = get_fields(request, POST_FIELDS)
+    return json_response({
+        'results': [serialize(found[pk], fields) for pk in ids if pk in found]
+    })
+
+
+@api_view(scope_etag('global', 'comments'))
+def index(request):
+    return posts_response(request, Post.objects.all())
+
+
+@api_view(scope_etag('group:{slug}', 'comments'))
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return posts_response(request, Post.objects.filter(group=group))
+
+
+@api_view()
+def profile(request, username):
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    return json_response({
+        'username': author.username,
+        'full_name': author.get_full_name(),
+        'posts_count': author.stats.posts_count,
+        'followers_count': author.stats.followers_count,
+    })
+
+
+@api_view(scope_etag('author:{username}', 'comments'))
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return posts_response(request, Post.objects.filter(author=author))
+
+
+@api_view(post_etag)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    return json_response(serialize(post, get_fields(request, POST_FIELDS)))
+
+
+@api_view(post_etag)
+def post_comments(request, post_id):
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    return page_response(
+        request, comments_paginator(post_id, get_limit(request)),
+        COMMENT_FIELDS,
+    )
+
+
+@api_view(private=True)
+def follow_index(request):
+    return page_response(
+        request, feed_paginator(request.user, get_limit(request)),
+        POST_FIELDS,
+    )
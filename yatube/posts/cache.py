@@ -0,0 +1,162 @@
+import time
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Post
+
+PAGE_KEY = 'posts:page:{}'
+VERSION_KEY = 'posts:version:{}'
+MODIFIED_KEY = 'posts:modified:{}'
+TOUCHED_KEY = 'posts:touched:{}'
+AUTHOR_KEY = 'posts:author:{}'
+
+
+def _digest(value):
+    return md5(value.encode()).hexdigest()
+
+
+def version_key(scope):
+    return VERSION_KEY.format(_digest(scope))
+
+
+def get_versions(*scopes):
+    """Return the current version of every scope.
+
+    A missing counter starts from the current time in milliseconds, so a
+    counter evicted from the cache never comes back with a value that an
+    older cached page was stored under.
+    """
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*scopes):
+    for scope in scopes:
+        try:
+            cache.incr(version_key(scope))
+        except ValueError:
+            get_versions(scope)
+    now = timezone.now()
+    cache.set_many(
+        {TOUCHED_KEY.format(_digest(scope)): now for scope in scopes}, None
+    )
+
+
+def scope_modified(scope):
+    """When ``scope`` was last bumped.
+
+    Like a missing version, a missing time starts from now, which is
+    never older than what an earlier response carried.
+    """
+    key = TOUCHED_KEY.format(_digest(scope))
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, timezone.now(), None)
+        modified = cache.get(key)
+    return modified
+
+
+def post_validators(post_id):
+    """When the post or its comments last changed, and its author.
+
+    Both are ``None`` if the post is gone. Kept in the cache by
+    :func:`touch_post`, read from the database only after an entry was
+    evicted.
+    """
+    keys = MODIFIED_KEY.format(post_id), AUTHOR_KEY.format(post_id)
+    cached = cache.get_many(keys)
+    if len(cached) < len(keys):
+        post = Post.objects.filter(pk=post_id).annotate(
+            last_comment=Max('comments__created')
+        ).values('updated_at', 'last_comment', 'author__username').first()
+        if post is None:
+            return None, None
+        username = post.pop('author__username')
+        found = dict(zip(keys, (max(filter(None, post.values())), username)))
+        for key in keys:
+            if key not in cached:
+                cache.add(key, found[key], None)
+                cached[key] = cache.get(key)
+    return tuple(cached[key] for key in keys)
+
+
+def post_modified(post_id):
+    """When the post or its comments last changed, ``None`` if it is gone."""
+    return post_validators(post_id)[0]
+
+
+def touch_post(post_id, modified=None, author=None):
+    if modified is None:
+        modified = timezone.now()
+    values = {MODIFIED_KEY.format(post_id): modified}
+    if author is not None:
+        values[AUTHOR_KEY.format(post_id)] = author
+    cache.set_many(values, None)
+
+
+def forget_post(post_id):
+    cache.delete_many([
+        MODIFIED_KEY.format(post_id), AUTHOR_KEY.format(post_id),
+    ])
+
+
+def post_page_modified(post_id):
+    """When anything on a post page last changed.
+
+    Besides the post and its comments the page shows how many posts its
+    author has, which moves with every bump of the author's scope.
+    """
+    modified, username = post_validators(post_id)
+    if modified is None:
+        return None
+    return max(modified, scope_modified(f'author:{username}'))
+
+
+def post_etag(request, post_id):
+    """Validator of a post page; the page differs between visitors."""
+    modified = post_page_modified(post_id)
+    if modified is None:
+        return None
+    return _digest(f'{post_id}:{modified.isoformat()}:{request.user.pk}')
+
+
+def post_last_modified(request, post_id):
+    return post_page_modified(post_id)
+
+
+def cache_page_versioned(*scopes):
+    """Cache anonymous GET responses of a view.
+
+    ``scopes`` are format strings filled with the view's keyword arguments,
+    e.g. ``'group:{slug}'``. The page is stored under the request path and
+    the versions of its scopes, so bumping any of them invalidates it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            versions = get_versions(
+                *(scope.format(**kwargs) for scope in scopes)
+            )
+            key = PAGE_KEY.format(_digest('{}:{}'.format(
+                request.get_full_path(), ':'.join(map(str, versions))
+            )))
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import (
+    Count, F, IntegerField, Max, OuterRef, Subquery, Sum,
+)
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Follow, Post, User
+
+COUNT_KEY = 'posts:count:{}'
+
+
+def count_rows(queryset, field):
+    """Correlated ``COUNT`` of ``queryset`` rows pointing at the outer row."""
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def users_with_counts():
+    return User.objects.annotate(
+        posts_total=count_rows(Post.objects, 'author'),
+        followers_total=count_rows(Follow.objects, 'author'),
+    )
+
+
+def posts_with_counts():
+    return Post.objects.annotate(
+        comments_total=count_rows(Comment.objects, 'post'),
+    )
+
+
+def recount_author(user_id):
+    user = users_with_counts().get(pk=user_id)
+    AuthorStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'posts_count': user.posts_total,
+            'followers_count': user.followers_total,
+        },
+    )
+
+
+def _add(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def _add_author(author_id, field, delta):
+    stats = AuthorStats.objects.filter(user_id=author_id)
+    # A missing row is rebuilt from scratch, but only on increments: on
+    # decrements the author may be in the middle of a cascade delete.
+    if not _add(stats, field, delta) and delta > 0 and not stats.exists():
+        recount_author(author_id)
+
+
+def add_posts(author_id, delta):
+    _add_author(author_id, 'posts_count', delta)
+
+
+def add_followers(author_id, delta):
+    _add_author(author_id, 'followers_count', delta)
+
+
+def add_comments(post_id, delta):
+    _add(Post.objects.filter(pk=post_id), 'comments_count', delta)
+
+
+def count_key(scope):
+    return COUNT_KEY.format(md5(scope.encode()).hexdigest())
+
+
+def estimated_count(queryset):
+    """Row count of the whole table without scanning it.
+
+    Taken from the planner statistics when ``ANALYZE`` has gathered them,
+    otherwise from the largest primary key, which overcounts by the rows
+    deleted since. Pages past the real end come back empty and the
+    paginators fall back to their last page.
+    """
+    table = queryset.model._meta.db_table
+    row = None
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # There is no sqlite_stat1 until the first ANALYZE. The pragma
+            # reads the loaded schema instead of scanning sqlite_master.
+            cursor.execute('PRAGMA table_info(sqlite_stat1)')
+            if cursor.fetchone():
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [table],
+                )
+                row = cursor.fetchone()
+                row = row and (int(row[0].split()[0]),)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return queryset.model._default_manager.aggregate(
+            last=Max('pk')
+        )['last'] or 0
+    return row[0]
+
+
+def cached_count(scope, queryset, estimate=False):
+    """Number of rows in ``queryset``, kept in the cache under ``scope``.
+
+    The cached value is moved by :func:`add_cached_count` as posts come
+    and go, and recounted once it expires. With ``estimate`` a missing
+    value is taken from the table statistics instead of ``COUNT(*)``.
+    """
+    key = count_key(scope)
+    count = cache.get(key)
+    if count is None:
+        count = estimated_count(queryset) if estimate else queryset.count()
+        cache.add(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+    return max(count, 0)
+
+
+def add_cached_count(delta, *scopes):
+    for scope in scopes:
+        try:
+            cache.incr(count_key(scope), delta)
+        except ValueError:
+            pass
+
+
+def followed_posts_count(user):
+    return AuthorStats.objects.filter(
+        user__following__user=user
+    ).aggregate(total=Sum('posts_count'))['total'] or 0
@@ -0,0 +1,134 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import connection
+
+from .counters import followed_posts_count
+from .models import AuthorStats, FeedEntry, Follow, Post
+from .paginators import FeedPaginator
+
+BATCH_SIZE = 500
+
+
+def is_pulled(author_id):
+    """Authors with too many followers are read at request time."""
+    return AuthorStats.objects.filter(
+        user_id=author_id, followers_count__gt=settings.FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def pulled_authors(user):
+    return list(
+        AuthorStats.objects.filter(
+            user__following__user=user,
+            followers_count__gt=settings.FEED_FANOUT_LIMIT,
+        ).values_list('user', flat=True)
+    )
+
+
+def fan_out(post):
+    if is_pulled(post.author_id):
+        return
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                post=post,
+                author_id=post.author_id,
+                pub_date=post.pub_date,
+            )
+            for user_id in Follow.objects.filter(
+                author_id=post.author_id
+            ).values_list('user_id', flat=True)
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    if is_pulled(author_id):
+        return
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                post_id=pk,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for pk, pub_date in Post.objects.filter(
+                author_id=author_id
+            ).values_list('pk', 'pub_date').iterator()
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def cleanup(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def fill(first_follow_id=0, first_post_id=0, author_id=None):
+    """Fan out posts from ``first_post_id`` along follows from
+    ``first_follow_id``, of one author when ``author_id`` is given.
+
+    Bulk loads bypass the signals; this fills their inboxes with a single
+    ``INSERT ... SELECT``, skipping entries already there. Returns the
+    number of rows added.
+    """
+    params = [first_follow_id, first_post_id, settings.FEED_FANOUT_LIMIT]
+    author_filter = ''
+    if author_id is not None:
+        author_filter = 'AND f.author_id = %s '
+        params.append(author_id)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {FeedEntry._meta.db_table} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Follow._meta.db_table} f '
+            f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+            f'LEFT JOIN {AuthorStats._meta.db_table} s '
+            f'ON s.user_id = f.author_id '
+            f'WHERE f.id >= %s AND p.id >= %s '
+            f'AND COALESCE(s.followers_count, 0) <= %s '
+            f'{author_filter}'
+            f'AND NOT EXISTS (SELECT 1 FROM {FeedEntry._meta.db_table} e '
+            f'WHERE e.user_id = f.user_id AND e.post_id = p.id)',
+            params,
+        )
+        return cursor.rowcount
+
+
+def unpull(author_id):
+    """Fill the inboxes of an author who just dropped to the fan-out limit.
+
+    Posts written and follows made while the author was pulled have no
+    inbox entries, and the feed reads fanned-out authors from the inbox
+    only.
+    """
+    if AuthorStats.objects.filter(
+        user_id=author_id, followers_count=settings.FEED_FANOUT_LIMIT
+    ).exists():
+        fill(author_id=author_id)
+
+
+def feed_paginator(user, per_page):
+    """Paginator over the follow feed of ``user``.
+
+    The feed holds every post of the followed authors, so it is counted
+    from their stored post counters rather than from the inbox.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    counter = partial(followed_posts_count, user)
+    pulled = pulled_authors(user)
+    if not pulled:
+        return FeedPaginator(entries, per_page, counter=counter)
+    return FeedPaginator(
+        entries.exclude(author__in=pulled),
+        per_page,
+        pulled=Post.objects.filter(author__in=pulled),
+        counter=counter,
+    )
@@ -0,0 +1,133 @@
+from hashlib import md5
+
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .cache import get_versions, scope_modified
+from .models import Group, Post, User
+
+FEED_SIZE = 20
+
+
+class LatestPostsFeed(Feed):
+    title = 'Последние обновления на сайте'
+    description = 'Новые записи всех пользователей Yatube'
+    scope = 'global'
+
+    def link(self, obj=None):
+        return reverse('posts:gen')
+
+    def posts(self, obj=None):
+        return Post.objects.all()
+
+    def items(self, obj=None):
+        return self.posts(obj).select_related('author', 'group')[:FEED_SIZE]
+
+    def item_title(self, item):
+        return item.text[:50]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # The newest pub_date Feed sends does not move on edits and
+        # deletes; condition() sets the scope's time instead.
+        del response['Last-Modified']
+        return response
+
+    @classmethod
+    def etag(cls, request, **kwargs):
+        """The page cache version of the scope, bumped by every write."""
+        version, = get_versions(cls.scope.format(**kwargs))
+        return md5('{}:{}:{}'.format(
+            cls.__name__, cls.scope.format(**kwargs), version
+        ).encode()).hexdigest()
+
+    @classmethod
+    def last_modified(cls, request, **kwargs):
+        """When the scope was last bumped, so edits and deletes count."""
+        return scope_modified(cls.scope.format(**kwargs))
+
+    @classmethod
+    def as_view(cls):
+        """The feed view answering unchanged polls with ``304``.
+
+        The validators cost two cache reads; the list query and the
+        rendering only run when they changed.
+        """
+        return condition(
+            etag_func=cls.etag, last_modified_func=cls.last_modified
+        )(cls())
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    scope = 'group:{slug}'
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return obj.title
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_posts', kwargs={'slug': obj.slug})
+
+    def posts(self, obj):
+        return Post.objects.filter(group=obj)
+
+
+class ProfilePostsFeed(LatestPostsFeed):
+    scope = 'author:{username}'
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Все посты пользователя {obj.username}'
+
+    def description(self, obj):
+        return self.title(obj)
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def posts(self, obj):
+        return Post.objects.filter(author=obj)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class ProfilePostsAtomFeed(ProfilePostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.title(obj)
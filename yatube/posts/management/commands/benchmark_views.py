@@ -0,0 +1,236 @@
+import json
+import math
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.template.backends.django import Template
+from django.test import Client
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from core.testing import isolated_cache
+from posts.models import Group, Post, User
+
+# A sensible --tolerance when the baseline was recorded on the same
+# machine; query counts must not grow at all.
+TOLERANCE = 0.2
+# Differences below this many milliseconds are noise.
+SLACK_MS = 1.0
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+@contextmanager
+def timed_queries(timings):
+    """Record how long every SQL query takes."""
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timings.append(time.perf_counter() - started)
+
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+@contextmanager
+def timed_renders(timings):
+    """Record how long every top-level template render takes."""
+    original = Template.render
+    depth = 0
+
+    def render(self, *args, **kwargs):
+        nonlocal depth
+        # Post cards render their own template inside the page; only
+        # the outermost render goes into the timings.
+        depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            depth -= 1
+            if not depth:
+                timings.append(time.perf_counter() - started)
+
+    Template.render = render
+    try:
+        yield
+    finally:
+        Template.render = original
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the posts views against seeded test databases of '
+        'increasing size and print latency percentiles, query counts, SQL '
+        'time and render time as JSON. With --baseline the run fails when '
+        'a view runs more queries than the baseline, and with --tolerance '
+        'also when it got slower by more than that fraction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default='0.05,0.2',
+            help='Comma separated seed scales, measured in this order.',
+        )
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON here.')
+        parser.add_argument('--baseline', help='JSON of an earlier run.')
+        parser.add_argument(
+            '--tolerance', type=float,
+            help=(
+                'Also fail on p95 latency this fraction over the baseline, '
+                f'e.g. {TOLERANCE}. Latencies only compare between runs '
+                'on the same machine.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.warmup = options['warmup']
+        scales = [float(scale) for scale in options['scales'].split(',')]
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Seeding clears the cache, which must not be the site's.
+            with isolated_cache():
+                results = self.run(scales, options['seed'])
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        report = json.dumps({'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def run(self, scales, seed):
+        results = []
+        seeded = 0
+        for number, scale in enumerate(scales):
+            # Every scale adds its difference to the rows already there.
+            call_command(
+                'seed', scale=scale - seeded, seed=seed + number,
+                prefix=f'bench{number}-', stdout=StringIO(),
+            )
+            seeded = scale
+            for view, request in self.requests():
+                results.append({
+                    'view': view,
+                    'scale': scale,
+                    'posts': Post.objects.count(),
+                    **self.measure(request),
+                })
+        return results
+
+    def requests(self):
+        """Pairs of view name and a callable making one request."""
+        reader = User.objects.annotate(
+            follows=Count('follower')
+        ).order_by('-follows').first()
+        author = User.objects.order_by('-stats__posts_count').first()
+        group = Group.objects.annotate(
+            posts=Count('groups')
+        ).order_by('-posts').first()
+        post = Post.objects.order_by('-comments_count').first()
+        client = Client()
+        client.force_login(reader)
+
+        def get(name, **kwargs):
+            url = reverse(f'posts:{name}', kwargs=kwargs)
+            return name, lambda: client.get(url)
+
+        def post_form(name, data, **kwargs):
+            url = reverse(f'posts:{name}', kwargs=kwargs)
+            return name, lambda: client.post(url, data)
+
+        return (
+            get('gen'),
+            get('group_posts', slug=group.slug),
+            get('profile', username=author.username),
+            get('post_detail', post_id=post.pk),
+            get('follow_index'),
+            post_form('post_create', {'text': 'Пост из бенчмарка'}),
+            post_form(
+                'add_comment', {'text': 'Комментарий из бенчмарка'},
+                post_id=post.pk,
+            ),
+        )
+
+    def measure(self, request):
+        for _ in range(self.warmup):
+            request()
+        latencies, queries, sql, renders = [], [], [], []
+        for _ in range(self.repeat):
+            query_timings, render_timings = [], []
+            with timed_queries(query_timings):
+                with timed_renders(render_timings):
+                    started = time.perf_counter()
+                    response = request()
+                    latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{response.status_code} from {response.request}'
+                )
+            queries.append(len(query_timings))
+            sql.append(sum(query_timings))
+            renders.append(sum(render_timings))
+        return {
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries': max(queries),
+            'sql_ms': round(percentile(sql, 0.5) * 1000, 2),
+            'render_ms': round(percentile(renders, 0.5) * 1000, 2),
+        }
+
+    def compare(self, results, path, tolerance):
+        with open(path) as baseline_file:
+            baseline = {
+                (row['view'], row['scale']): row
+                for row in json.load(baseline_file)['results']
+            }
+        regressions = []
+        for row in results:
+            base = baseline.get((row['view'], row['scale']))
+            if base is None:
+                continue
+            if row['queries'] > base['queries']:
+                regressions.append(
+                    f'{row["view"]} at scale {row["scale"]}: '
+                    f'{row["queries"]} queries, baseline {base["queries"]}'
+                )
+            if tolerance is None:
+                continue
+            limit = base['p95_ms'] * (1 + tolerance) + SLACK_MS
+            if row['p95_ms'] > limit:
+                regressions.append(
+                    f'{row["view"]} at scale {row["scale"]}: p95 '
+                    f'{row["p95_ms"]}ms, baseline {base["p95_ms"]}ms'
+                )
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} regressions against {path}.'
+            )
+        self.stderr.write(f'No regressions against {path}.')
@@ -0,0 +1,99 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from core.testing import isolated_cache
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import comments_paginator
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+# PostForm renders every group in its select box; sqlite_stat1 holds a
+# row per index and is read for the estimated index page count.
+ALLOWED_SCANS = {'posts_group', 'sqlite_stat1'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN QUERY PLAN on the queries of every posts view and fail '
+        'if any of them needs a full table scan.'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN requires SQLite.')
+        self.verbosity = options['verbosity']
+        # The probe rows are rolled back; what their signals cache must
+        # not reach the site's cache either.
+        with isolated_cache(), transaction.atomic():
+            failures = self.check_views()
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(
+                'Full table scans found:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('All view queries use indexes.'))
+
+    def get_requests(self):
+        reader, _ = User.objects.get_or_create(username='explain_reader')
+        author, _ = User.objects.get_or_create(username='explain_author')
+        group, _ = Group.objects.get_or_create(
+            slug='explain-group',
+            defaults={'title': 'explain', 'description': 'explain'},
+        )
+        post = Post.objects.create(author=author, group=group, text='explain')
+        comment = Comment.objects.create(
+            post=post, author=reader, text='explain'
+        )
+        cursor = comments_paginator(post.pk).encode_cursor(comment, 2)
+        Follow.objects.get_or_create(user=reader, author=author)
+        reader_client = Client()
+        reader_client.force_login(reader)
+        author_client = Client()
+        author_client.force_login(author)
+        return [
+            (reader_client, reverse('posts:gen')),
+            (reader_client, reverse('posts:group_posts', args=[group.slug])),
+            (reader_client, reverse('posts:profile', args=[author.username])),
+            (reader_client, reverse('posts:post_detail', args=[post.pk])),
+            (reader_client, reverse('posts:post_comments', args=[post.pk])
+             + f'?after={cursor}'),
+            (reader_client, reverse('posts:search') + '?q=explain'),
+            (reader_client, reverse('posts:follow_index')),
+            (reader_client, reverse('posts:post_create')),
+            (author_client, reverse('posts:post_edit', args=[post.pk])),
+        ]
+
+    def check_views(self):
+        failures = []
+        for client, url in self.get_requests():
+            queries = []
+
+            def capture(execute, sql, params, many, context):
+                result = execute(sql, params, many, context)
+                # Failed probes, like a missing sqlite_stat1, are skipped.
+                if sql.lstrip().upper().startswith('SELECT'):
+                    queries.append((sql, params))
+                return result
+
+            with connection.execute_wrapper(capture):
+                client.get(url)
+            self.stdout.write(f'{url}: {len(queries)} queries')
+            for sql, params in queries:
+                for detail in self.explain(sql, params):
+                    if self.verbosity > 1:
+                        self.stdout.write(f'    {detail}')
+                    match = FULL_SCAN.match(detail)
+                    if match and match.group(1) not in ALLOWED_SCANS:
+                        failures.append(f'{url}: {detail}\n    {sql}')
+        return failures
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
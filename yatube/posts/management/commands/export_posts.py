@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream posts of an author and/or a group as NDJSON or CSV, oldest '
+        'first. For incremental exports pass the pub_date and id of the '
+        'last row as --after "<pub_date>,<id>" of the next run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Username.')
+        parser.add_argument('--group', help='Group slug.')
+        parser.add_argument('--since', help='Date or datetime, inclusive.')
+        parser.add_argument('--until', help='Date or datetime, exclusive.')
+        parser.add_argument(
+            '--after', help='pub_date,id of the last row already exported.'
+        )
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default='ndjson'
+        )
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+        parser.add_argument(
+            '--output', help='File to write, stdout by default.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        try:
+            if options['author']:
+                queryset = queryset.filter(
+                    author=User.objects.get(username=options['author'])
+                )
+            if options['group']:
+                queryset = queryset.filter(
+                    group=Group.objects.get(slug=options['group'])
+                )
+            since = export.parse_bound(options['since'])
+            until = export.parse_bound(options['until'])
+            after = export.parse_after(options['after'])
+        except (User.DoesNotExist, Group.DoesNotExist, ValueError) as error:
+            raise CommandError(error)
+        lines = export.LINES[options['format']](export.rows(
+            export.export_posts(queryset, since, until, after),
+            chunk_size=options['chunk_size'],
+        ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails, thumbnails_ready
+
+
+def _generate(post, force=False):
+    try:
+        generate_thumbnails(post, force)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Generate the configured thumbnails for existing post images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.THUMBNAIL_WORKERS
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate thumbnails that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        posts = (
+            post for post in Post.objects.exclude(image='').only(
+                'image'
+            ).iterator()
+            if options['force'] or not thumbnails_ready(post.image)
+        )
+        generated = 0
+        if options['workers'] <= 1:
+            for post in posts:
+                generate_thumbnails(post, options['force'])
+                generated += 1
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                for _ in pool.map(
+                    partial(_generate, force=options['force']), posts
+                ):
+                    generated += 1
+        self.stdout.write(f'Generated thumbnails for {generated} posts.')
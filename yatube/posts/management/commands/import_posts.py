@@ -0,0 +1,274 @@
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import feed, search
+from posts.counters import count_rows
+from posts.models import AuthorStats, Comment, Group, Post, User
+
+from .seed import explicit_dates, next_pk
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def batches(records, size):
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_date(value):
+    date = parse_datetime(value) if value else None
+    if date is None:
+        return timezone.now()
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream posts and comments from NDJSON or CSV into the database. '
+        'Every record has a "type" of "post" (id, author, group, text, '
+        'pub_date) or "comment" (post, author, text, created); authors '
+        'and groups are looked up by username and slug, comments find '
+        'their post by its id in the input. Counters, follow inboxes and '
+        'the search index are brought up to date once at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, or - for stdin.')
+        parser.add_argument('--format', choices=READERS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Progress file; an interrupted import resumes from it.',
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Create unknown authors and groups instead of skipping.',
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Drop post and comment indexes while loading.',
+        )
+
+    def handle(self, *args, **options):
+        self.create_missing = options['create_missing']
+        self.checkpoint = options['checkpoint']
+        self.users, self.groups = {}, {}
+        self.state = self.load_checkpoint()
+        if self.state.get('done'):
+            self.stdout.write('This import has already finished.')
+            return
+        started = time.monotonic()
+        fmt = options['format'] or (
+            'csv' if options['path'].endswith('.csv') else 'ndjson'
+        )
+        stream = sys.stdin if options['path'] == '-' else open(
+            options['path'], encoding='utf-8', newline=''
+        )
+        try:
+            records = islice(
+                READERS[fmt](stream), self.state['records'], None
+            )
+            if options['defer_indexes']:
+                self.set_indexes(False)
+            for batch in batches(records, options['batch_size']):
+                self.import_batch(batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if options['defer_indexes']:
+                self.set_indexes(True)
+        self.finish()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Imported {self.state["imported"]} records, skipped '
+            f'{self.state["skipped"]}, in {elapsed:.1f}s '
+            f'({self.state["imported"] / max(elapsed, 1e-6):.0f} rows/s).'
+        )
+
+    def load_checkpoint(self):
+        state = {
+            'records': 0, 'imported': 0, 'skipped': 0,
+            'first_post': None, 'first_comment': None, 'posts': {},
+        }
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as checkpoint:
+                for line in read_ndjson(checkpoint):
+                    posts = line.pop('posts', {})
+                    state.update(line)
+                    state['posts'].update(posts)
+        return state
+
+    def save_checkpoint(self, **progress):
+        self.state['posts'].update(progress.get('posts', {}))
+        self.state.update(
+            {key: value for key, value in progress.items() if key != 'posts'}
+        )
+        if not self.checkpoint:
+            return
+        # Lines are appended after each commit; loading merges them.
+        with open(self.checkpoint, 'a') as checkpoint:
+            checkpoint.write(json.dumps(progress) + '\n')
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+    def set_indexes(self, present):
+        with connection.cursor() as cursor:
+            existing = {
+                model: connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                ) for model in (Post, Comment)
+            }
+            # Only the SQL of the editor is used: the SQLite editor cannot
+            # be entered inside a transaction.
+            editor = connection.schema_editor()
+            for model, constraints in existing.items():
+                for index in model._meta.indexes:
+                    if present and index.name not in constraints:
+                        cursor.execute(str(index.create_sql(model, editor)))
+                    elif not present and index.name in constraints:
+                        cursor.execute(str(index.remove_sql(model, editor)))
+
+    def resolve(self, model, field, cache_map, values, defaults):
+        """Fill ``cache_map`` with the keys of ``values`` of ``field``."""
+        missing = set(values) - set(cache_map) - {None, ''}
+        if not missing:
+            return
+        found = dict(model.objects.filter(
+            **{f'{field}__in': missing}
+        ).values_list(field, 'pk'))
+        if self.create_missing and len(found) < len(missing):
+            model.objects.bulk_create(
+                [model(**{field: value}, **defaults(value))
+                 for value in missing - set(found)],
+                ignore_conflicts=True,
+            )
+            found = dict(model.objects.filter(
+                **{f'{field}__in': missing}
+            ).values_list(field, 'pk'))
+        cache_map.update(found)
+
+    def import_batch(self, batch):
+        kinds = {'post': [], 'comment': []}
+        for record in batch:
+            kinds.setdefault(record.get('type') or 'post', []).append(record)
+        self.resolve(
+            User, 'username', self.users,
+            (record.get('author') for record in batch),
+            lambda username: {'password': '!'},
+        )
+        self.resolve(
+            Group, 'slug', self.groups,
+            (record.get('group') for record in kinds['post']),
+            lambda slug: {'title': slug, 'description': ''},
+        )
+        with transaction.atomic():
+            posts = self.import_posts(kinds['post'])
+            self.state['posts'].update(posts)
+            comments = self.import_comments(kinds['comment'])
+        imported = len(posts) + comments
+        self.save_checkpoint(
+            records=self.state['records'] + len(batch),
+            imported=self.state['imported'] + imported,
+            skipped=self.state['skipped'] + len(batch) - imported,
+            posts=posts,
+            first_post=self.state['first_post'] or (
+                min(posts.values()) if posts else None
+            ),
+            first_comment=self.state['first_comment'],
+        )
+
+    def import_posts(self, records):
+        """Create the posts and return their keys by input id."""
+        records = [
+            record for record in records
+            if record.get('author') in self.users
+            and (not record.get('group') or record['group'] in self.groups)
+        ]
+        if not records:
+            return {}
+        # SQLite does not return the keys of bulk inserts, so they are
+        # set here; a post written meanwhile makes the insert fail.
+        first = next_pk(Post)
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            Post.objects.bulk_create(Post(
+                pk=first + i,
+                text=record['text'],
+                author_id=self.users[record['author']],
+                group_id=self.groups.get(record.get('group')),
+                pub_date=parse_date(record.get('pub_date')),
+            ) for i, record in enumerate(records))
+        return {
+            str(record.get('id')): first + i
+            for i, record in enumerate(records)
+        }
+
+    def import_comments(self, records):
+        posts = self.state['posts']
+        comments = [
+            Comment(
+                post_id=posts[str(record['post'])],
+                author_id=self.users[record['author']],
+                text=record['text'],
+                created=parse_date(record.get('created')),
+            ) for record in records
+            if str(record.get('post')) in posts
+            and record.get('author') in self.users
+        ]
+        if comments and self.state['first_comment'] is None:
+            self.state['first_comment'] = next_pk(Comment)
+        with explicit_dates(Comment._meta.get_field('created')):
+            Comment.objects.bulk_create(comments)
+        return len(comments)
+
+    def finish(self):
+        """Counters, inboxes and the search index skipped while loading."""
+        first_post = self.state['first_post']
+        first_comment = self.state['first_comment']
+        with transaction.atomic():
+            AuthorStats.objects.bulk_create(
+                (AuthorStats(user=user)
+                 for user in User.objects.filter(stats__isnull=True)),
+                ignore_conflicts=True,
+            )
+            if first_post is not None:
+                AuthorStats.objects.filter(user__in=Post.objects.filter(
+                    pk__gte=first_post
+                ).values('author')).update(
+                    posts_count=count_rows(Post.objects, 'author'),
+                )
+                feed.fill(first_post_id=first_post)
+                search.index_from(first_post)
+            if first_comment is not None:
+                Post.objects.filter(pk__in=Comment.objects.filter(
+                    pk__gte=first_comment
+                ).values('post')).update(
+                    comments_count=count_rows(Comment.objects, 'post'),
+                )
+        self.save_checkpoint(done=True)
+        cache.clear()
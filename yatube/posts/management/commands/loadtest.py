@@ -0,0 +1,312 @@
+import json
+import random
+import socketserver
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+from django.core.signals import got_request_exception
+from django.db import OperationalError
+from django.urls import reverse
+from requests.cookies import RequestsCookieJar
+
+from posts.models import Group, Post, User
+
+from .benchmark_views import percentile
+
+DEFAULT_MIX = 'read=60,feed=15,post=5,comment=10,follow=10'
+# Upper bounds of the latency histogram buckets, in milliseconds.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+LOCKED = 'database is locked'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class ThreadedWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Stats:
+    """Latencies and failures of every endpoint, shared by the workers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.locked = 0
+
+    def add(self, endpoint, elapsed, response=None):
+        failed = response is None or response.status_code >= 400
+        with self.lock:
+            self.latencies[endpoint].append(elapsed * 1000)
+            if failed:
+                self.errors[endpoint] += 1
+            if response is not None and LOCKED in response.text:
+                self.locked += 1
+
+    def server_error(self, sender, request=None, **kwargs):
+        """Count lock errors raised inside the in-process server."""
+        error = sys.exc_info()[1]
+        if isinstance(error, OperationalError) and LOCKED in str(error):
+            with self.lock:
+                self.locked += 1
+
+    def report(self, elapsed):
+        total = sum(len(values) for values in self.latencies.values())
+        errors = sum(self.errors.values())
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            histogram = [0] * (len(BUCKETS) + 1)
+            for value in values:
+                histogram[sum(value > bound for bound in BUCKETS)] += 1
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors[endpoint],
+                'p50_ms': round(percentile(values, 0.5), 2),
+                'p95_ms': round(percentile(values, 0.95), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'histogram': histogram,
+            }
+        return {
+            'seconds': round(elapsed, 2),
+            'requests': total,
+            'rps': round(total / elapsed, 1),
+            'error_rate': round(errors / max(total, 1), 4),
+            'locked_errors': self.locked,
+            'buckets_ms': list(BUCKETS),
+            'endpoints': endpoints,
+        }
+
+
+class Worker:
+    """One simulated visitor with its own session."""
+
+    def __init__(self, command, user):
+        self.command = command
+        self.base = command.base
+        self.rng = random.Random()
+        self.session = requests.Session()
+        self.user = user
+        if user is not None:
+            self.login()
+
+    def login(self):
+        url = self.base + reverse('users:login')
+        self.session.get(url)
+        response = self.session.post(url, {
+            'username': self.user,
+            'password': self.command.password,
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken'),
+        }, allow_redirects=False)
+        if response.status_code != 302:
+            raise CommandError(f'Could not log in as {self.user}.')
+
+    def request(self, endpoint, method, name, data=None, files=None,
+                **kwargs):
+        url = self.base + reverse(f'posts:{name}', kwargs=kwargs)
+        headers = {'X-CSRFToken': self.session.cookies.get('csrftoken', '')}
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, url, data=data, files=files, headers=headers,
+                allow_redirects=False, timeout=self.command.timeout,
+            )
+        except requests.RequestException:
+            response = None
+        self.command.stats.add(
+            endpoint, time.perf_counter() - started, response
+        )
+
+    def read(self):
+        sample = self.command.sample
+        name, kwargs = self.rng.choice((
+            ('gen', {}),
+            ('group_posts', {'slug': self.rng.choice(sample['groups'])}),
+            ('profile', {'username': self.rng.choice(sample['users'])}),
+            ('post_detail', {'post_id': self.rng.choice(sample['posts'])}),
+        ))
+        # Reads go without the session cookie, as an anonymous visitor.
+        cookies, self.session.cookies = (
+            self.session.cookies, RequestsCookieJar()
+        )
+        try:
+            self.request(name, 'GET', name, **kwargs)
+        finally:
+            self.session.cookies = cookies
+
+    def feed(self):
+        self.request('follow_index', 'GET', 'follow_index')
+
+    def post(self):
+        self.request(
+            'post_create', 'POST', 'post_create',
+            data={'text': 'Пост из нагрузочного теста'},
+            files={'image': ('load.gif', SMALL_GIF, 'image/gif')},
+        )
+
+    def comment(self):
+        self.request(
+            'add_comment', 'POST', 'add_comment',
+            data={'text': 'Комментарий из нагрузочного теста'},
+            post_id=self.rng.choice(self.command.sample['posts']),
+        )
+
+    def follow(self):
+        name = self.rng.choice(('profile_follow', 'profile_unfollow'))
+        self.request(
+            name, 'GET', name,
+            username=self.rng.choice(self.command.sample['users']),
+        )
+
+    def run(self, deadline):
+        operations, weights = zip(*self.command.mix.items())
+        while time.monotonic() < deadline:
+            getattr(self, self.rng.choices(operations, weights)[0])()
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a mixed workload of anonymous reads, feed reads, posts with '
+        'images, comments and follows against the WSGI app and report '
+        'requests per second, error rate and per-endpoint latencies. '
+        'Without --url a threaded server is started in this process; '
+        'point --url at a separately started server to keep the load '
+        'generator off its CPU.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help='Weights of read, feed, post, comment and follow.',
+        )
+        parser.add_argument(
+            '--users-prefix', default='seed',
+            help='Log in as users whose names start with this.',
+        )
+        parser.add_argument(
+            '--password', help='Password of those users, see seed.',
+        )
+        parser.add_argument('--json', help='Also write the report here.')
+
+    def handle(self, *args, **options):
+        self.mix = self.parse_mix(options['mix'])
+        self.password = options['password']
+        self.timeout = options['timeout']
+        self.stats = Stats()
+        self.sample = self.sample_rows(options['users_prefix'])
+        logins = self.logins(options['concurrency'])
+
+        server = None
+        self.base = options['url']
+        if self.base is None:
+            server = self.start_server()
+        self.base = self.base.rstrip('/')
+        try:
+            report = self.run(logins, options['duration'])
+        finally:
+            if server is not None:
+                got_request_exception.disconnect(self.stats.server_error)
+                server.shutdown()
+                server.server_close()
+
+        self.print_report(report)
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def parse_mix(self, value):
+        try:
+            mix = {
+                name: float(weight) for name, weight in (
+                    item.split('=') for item in value.split(',')
+                )
+            }
+        except ValueError:
+            raise CommandError(f'Bad --mix: {value}')
+        unknown = set(mix) - {'read', 'feed', 'post', 'comment', 'follow'}
+        if unknown:
+            raise CommandError(f'Unknown operations: {", ".join(unknown)}')
+        return mix
+
+    def sample_rows(self, prefix):
+        users = list(User.objects.filter(
+            username__startswith=prefix
+        ).values_list('username', flat=True)[:1000])
+        sample = {
+            'users': users,
+            'groups': list(Group.objects.values_list('slug', flat=True)[
+                :1000
+            ]),
+            'posts': list(Post.objects.order_by('-pub_date').values_list(
+                'pk', flat=True
+            )[:1000]),
+        }
+        missing = [name for name, rows in sample.items() if not rows]
+        if missing:
+            raise CommandError(
+                f'No {", ".join(missing)} to load, run seed first.'
+            )
+        return sample
+
+    def logins(self, concurrency):
+        if set(self.mix) <= {'read'}:
+            return [None] * concurrency
+        if not self.password:
+            raise CommandError('Logged-in operations need --password.')
+        users = self.sample['users']
+        return [users[i % len(users)] for i in range(concurrency)]
+
+    def start_server(self):
+        from yatube.wsgi import application
+
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(application)
+        got_request_exception.connect(self.stats.server_error)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.base = 'http://127.0.0.1:{}'.format(server.server_port)
+        return server
+
+    def run(self, logins, duration):
+        workers = [Worker(self, user) for user in logins]
+        started = time.monotonic()
+        deadline = started + duration
+        with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+            for future in [pool.submit(worker.run, deadline)
+                           for worker in workers]:
+                future.result()
+        return self.stats.report(time.monotonic() - started)
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{report["requests"]} requests in {report["seconds"]}s: '
+            f'{report["rps"]} req/s, error rate {report["error_rate"]:.2%}, '
+            f'{report["locked_errors"]} "{LOCKED}" errors'
+        )
+        header = ' '.join(f'<={bound}' for bound in BUCKETS) + ' >'
+        self.stdout.write(f'{"endpoint":<18} n err p50 p95 p99 | {header}')
+        for endpoint, row in report['endpoints'].items():
+            self.stdout.write(
+                f'{endpoint:<18} {row["requests"]} {row["errors"]} '
+                f'{row["p50_ms"]} {row["p95_ms"]} {row["p99_ms"]} | '
+                + ' '.join(map(str, row['histogram']))
+            )
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import posts_with_counts, users_with_counts
+from posts.models import AuthorStats, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute post, follower and comment counters in batches and '
+        'report how far the stored values drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report drift, do not fix it.',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        drift = self.reconcile_authors() + self.reconcile_posts()
+        verb = 'Found' if self.dry_run else 'Fixed'
+        self.stdout.write(f'{verb} {drift} drifted counters.')
+
+    def batches(self, queryset):
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk')[
+                    :self.batch_size
+                ]
+            )
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1].pk
+
+    def report(self, label, field, stored, actual):
+        self.stdout.write(f'{label} {field}: {stored} -> {actual}')
+
+    def reconcile_authors(self):
+        drift = 0
+        for users in self.batches(users_with_counts().only('username')):
+            stats = AuthorStats.objects.in_bulk([user.pk for user in users])
+            changed, missing = [], []
+            for user in users:
+                row = stats.get(user.pk)
+                if row is None:
+                    row = AuthorStats(user=user)
+                    missing.append(row)
+                for field, actual in (('posts_count', user.posts_total),
+                                      ('followers_count',
+                                       user.followers_total)):
+                    stored = getattr(row, field)
+                    if stored != actual:
+                        self.report(f'user {user.username}', field,
+                                    stored, actual)
+                        setattr(row, field, actual)
+                        drift += 1
+                        if row not in missing and row not in changed:
+                            changed.append(row)
+            if not self.dry_run:
+                AuthorStats.objects.bulk_create(missing)
+                AuthorStats.objects.bulk_update(
+                    changed, ['posts_count', 'followers_count']
+                )
+        return drift
+
+    def reconcile_posts(self):
+        drift = 0
+        for posts in self.batches(
+            posts_with_counts().only('comments_count')
+        ):
+            changed = []
+            for post in posts:
+                if post.comments_count != post.comments_total:
+                    self.report(f'post {post.pk}', 'comments_count',
+                                post.comments_count, post.comments_total)
+                    post.comments_count = post.comments_total
+                    changed.append(post)
+            drift += len(changed)
+            if not self.dry_run:
+                Post.objects.bulk_update(changed, ['comments_count'])
+        return drift
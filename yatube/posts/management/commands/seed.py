@@ -0,0 +1,281 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from math import gcd
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts import feed, search
+from posts.counters import count_rows
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+# Rows of every kind at scale 1; --scale multiplies all of them.
+BASE_ROWS = {
+    'users': 1000,
+    'groups': 20,
+    'posts': 20000,
+    'comments': 40000,
+    'follows': 15000,
+}
+WORDS = (
+    'привет мир пост день утро вечер город море лес книга музыка кино '
+    'кофе чай работа отпуск дорога поезд самолёт фото кот собака погода '
+    'дождь снег солнце весна лето осень зима друг семья праздник новости '
+    'спорт футбол код python django база запрос индекс кэш'
+).split()
+# Multiplier of the permutation that spreads Zipf ranks over row indexes.
+SCATTER = 1000003
+
+
+def zipf_index(rng, n, s):
+    """Index in ``range(n)`` drawn with weight close to ``1 / (i + 1) ** s``.
+
+    Inverse transform of the continuous power law, so no table of
+    weights is kept however large ``n`` is.
+    """
+    u = rng.random()
+    if s == 1:
+        x = (n + 1) ** u
+    else:
+        x = (((n + 1) ** (1 - s) - 1) * u + 1) ** (1 / (1 - s))
+    return min(int(x) - 1, n - 1)
+
+
+def scatter(index, n, salt=0):
+    """Map a rank to a row index, so popular rows are not all adjacent."""
+    step = SCATTER if gcd(SCATTER, n) == 1 else 1
+    return (index * step + salt) % n
+
+
+def next_pk(model):
+    """The key SQLite gives the next row of ``model``.
+
+    Django declares SQLite keys ``AUTOINCREMENT``, so keys of deleted rows
+    are not reused: the next one follows the larger of the highest key
+    in the table and the one kept in ``sqlite_sequence``.
+    """
+    top = model.objects.aggregate(top=Max('pk'))['top'] or 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT seq FROM sqlite_sequence WHERE name = %s',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return max(top, row[0] if row else 0) + 1
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let ``bulk_create`` keep the dates set on ``auto_now_add`` fields."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic users, groups, posts, comments '
+        'and follows. Authorship, follows and comments follow a Zipf '
+        'distribution; the same --seed always produces the same rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Exponent of the popularity and activity distributions.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Spread post dates over this many days up to now.',
+        )
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument(
+            '--password',
+            help='Password of every user; by default they cannot log in.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.s = options['zipf']
+        self.prefix = options['prefix']
+        self.sizes = {
+            name: max(int(rows * options['scale']), 1)
+            for name, rows in BASE_ROWS.items()
+        }
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f'Users named {self.prefix}* already exist, '
+                f'pick another --prefix.'
+            )
+        self.end = timezone.now()
+        self.span = timedelta(days=options['days'])
+        self.password = make_password(options['password'])
+
+        started = time.monotonic()
+        total = 0
+        # One transaction, so a failed step leaves no rows under the prefix
+        # and no other writer can take keys in the middle of a step.
+        with transaction.atomic():
+            for name, step in (('users', self.seed_users),
+                               ('groups', self.seed_groups),
+                               ('follows', self.seed_follows),
+                               ('posts', self.seed_posts),
+                               ('comments', self.seed_comments),
+                               ('derived rows', self.seed_derived)):
+                step_started = time.monotonic()
+                rows = step()
+                total += rows
+                self.report(name, rows, time.monotonic() - step_started)
+        cache.clear()
+        self.report('total', total, time.monotonic() - started)
+
+    def report(self, name, rows, elapsed):
+        self.stdout.write(
+            f'{name}: {rows} rows in {elapsed:.1f}s '
+            f'({rows / max(elapsed, 1e-6):.0f} rows/s)'
+        )
+
+    def insert(self, model, objects, **kwargs):
+        """``bulk_create`` every ``batch_size`` objects; the first key.
+
+        SQLite does not return the keys of bulk inserts, so they are set
+        here, except on rows that may be dropped as conflicts.
+        """
+        first = next_pk(model)
+        explicit = not kwargs.get('ignore_conflicts')
+        batch = []
+        for number, obj in enumerate(objects):
+            if explicit:
+                obj.pk = first + number
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch, **kwargs)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, **kwargs)
+        return first
+
+    def text(self, low, high):
+        return ' '.join(
+            self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high))
+        ).capitalize()
+
+    def user_index(self, salt):
+        size = self.sizes['users']
+        return scatter(zipf_index(self.rng, size, self.s), size, salt)
+
+    def seed_users(self):
+        size = self.sizes['users']
+        self.first_user = self.insert(User, (
+            User(
+                username=f'{self.prefix}{i}',
+                first_name=self.text(1, 1),
+                password=self.password,
+                date_joined=self.end - self.span,
+            ) for i in range(size)
+        ))
+        return size
+
+    def seed_groups(self):
+        size = self.sizes['groups']
+        self.first_group = self.insert(Group, (
+            Group(
+                title=f'Группа {self.text(1, 2)} №{i}',
+                slug=f'{self.prefix}-group-{i}',
+                description=self.text(5, 20),
+            ) for i in range(size)
+        ))
+        return size
+
+    def seed_follows(self):
+        def follows():
+            for _ in range(self.sizes['follows']):
+                user = self.user_index(salt=1)
+                author = self.user_index(salt=0)
+                if user != author:
+                    yield Follow(
+                        user_id=self.first_user + user,
+                        author_id=self.first_user + author,
+                    )
+
+        # Popular pairs repeat; the unique constraint drops the repeats.
+        self.first_follow = self.insert(
+            Follow, follows(), ignore_conflicts=True
+        )
+        return Follow.objects.filter(pk__gte=self.first_follow).count()
+
+    def post_date(self, index):
+        return self.end - self.span + self.span * index / self.sizes['posts']
+
+    def seed_posts(self):
+        size = self.sizes['posts']
+        groups = self.sizes['groups']
+
+        def posts():
+            for i in range(size):
+                group = None
+                if self.rng.random() < 0.7:
+                    group = self.first_group + scatter(
+                        zipf_index(self.rng, groups, self.s), groups
+                    )
+                yield Post(
+                    text=self.text(5, 60),
+                    pub_date=self.post_date(i),
+                    author_id=self.first_user + self.user_index(salt=0),
+                    group_id=group,
+                )
+
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            self.first_post = self.insert(Post, posts())
+        return size
+
+    def seed_comments(self):
+        size = self.sizes['comments']
+        posts = self.sizes['posts']
+
+        def comments():
+            for _ in range(size):
+                post = scatter(zipf_index(self.rng, posts, self.s), posts)
+                yield Comment(
+                    post_id=self.first_post + post,
+                    author_id=self.first_user + self.user_index(salt=2),
+                    text=self.text(2, 30),
+                    created=min(self.end, self.post_date(post) + timedelta(
+                        minutes=self.rng.randint(1, 60 * 24)
+                    )),
+                )
+
+        with explicit_dates(Comment._meta.get_field('created')):
+            self.insert(Comment, comments())
+        return size
+
+    def seed_derived(self):
+        """Counters, inboxes and the search index skipped by bulk inserts."""
+        self.insert(AuthorStats, (
+            AuthorStats(user_id=self.first_user + i)
+            for i in range(self.sizes['users'])
+        ), ignore_conflicts=True)
+        AuthorStats.objects.filter(user__gte=self.first_user).update(
+            posts_count=count_rows(Post.objects, 'author'),
+            followers_count=count_rows(Follow.objects, 'author'),
+        )
+        Post.objects.filter(pk__gte=self.first_post).update(
+            comments_count=count_rows(Comment.objects, 'post'),
+        )
+        rows = self.sizes['users'] + feed.fill(self.first_follow)
+        search.rebuild()
+        return rows
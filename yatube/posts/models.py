@@ -4,6 +4,24 @@ from django.db import models
 User = get_user_model()
 
 
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
+
+    class Meta:
+        verbose_name = "author stats"
+        verbose_name_plural = "author stats"
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique='True')
@@ -24,6 +42,7 @@ class Post(models.Model):
     )
 
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -44,6 +63,7 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.text[:15]
@@ -52,6 +72,15 @@ class Post(models.Model):
         ordering = ["-pub_date"]
         verbose_name = "post"
         verbose_name_plural = "posts"
+        indexes = [
+            models.Index(fields=['pub_date', 'id'], name='post_date'),
+            models.Index(
+                fields=['author', 'pub_date', 'id'], name='post_author_date'
+            ),
+            models.Index(
+                fields=['group', 'pub_date', 'id'], name='post_group_date'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -81,6 +110,11 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "comment"
         verbose_name_plural = "comments"
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'], name='comment_post_created'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -104,3 +138,48 @@ class Follow(models.Model):
     class Meta:
         verbose_name = "follow"
         verbose_name_plural = "follows"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='feed'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='feed_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    def __str__(self):
+        return f'Пост {self.post_id} в ленте {self.user}'
+
+    class Meta:
+        verbose_name = "feed entry"
+        verbose_name_plural = "feed entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_feed_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'], name='feed_user_date'
+            ),
+            models.Index(fields=['user', 'author'], name='feed_user_author'),
+        ]
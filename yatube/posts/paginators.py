@@ -0,0 +1,326 @@
+import base64
+import json
+from itertools import chain
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import (
+    EmptyPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+MAX_KEY = 2 ** 63 - 1
+
+
+class CursorPage(Page):
+    """Page that knows its neighbours without counting the whole table."""
+
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        if self._has_next is None:
+            return super().has_next()
+        return self._has_next
+
+    def has_previous(self):
+        if self._has_previous is None:
+            return super().has_previous()
+        return self._has_previous
+
+    def next_page_number(self):
+        if not self.has_next():
+            raise EmptyPage('That page contains no results')
+        return self.number + 1
+
+    def previous_page_number(self):
+        if not self.has_previous():
+            raise EmptyPage('That page number is less than 1')
+        return self.number - 1
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not len(self):
+            return None
+        return self.paginator.encode_cursor(self[-1], self.number + 1)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not len(self):
+            return None
+        return self.paginator.encode_cursor(self[0], self.number - 1)
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator over ``(field, pk)``.
+
+    Pages reached through ``after``/``before`` tokens are fetched with an
+    indexed range condition and ``LIMIT per_page + 1``, so their cost does
+    not depend on how deep the page is. Plain ``?page=N`` links still work
+    through the regular ``OFFSET`` path of :class:`Paginator`.
+
+    ``counter`` is an optional callable returning the number of rows, for
+    callers that keep the count somewhere cheaper than ``SELECT COUNT(*)``;
+    with ``estimated`` that number is only an estimate, and the page range
+    links no pages past the current one. Page numbers are validated
+    without counting: an ``OFFSET`` page past the end is detected by coming
+    back empty and answered with :meth:`last_page`, as is ``page=last``.
+    """
+
+    tiebreak = 'pk'
+    estimated = False
+    ELLIPSIS = '…'
+    LAST = 'last'
+
+    def __init__(self, object_list, per_page, ordering='-pub_date',
+                 counter=None, estimated=False, **kwargs):
+        self.counter = counter
+        self.estimated = estimated
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        tiebreak = f'-{self.tiebreak}' if self.descending else self.tiebreak
+        super().__init__(
+            object_list.order_by(ordering, tiebreak), per_page, **kwargs
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        if self.counter is None:
+            return super().count
+        return self.counter()
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        # The OFFSET has to fit a 64-bit SQL integer.
+        if (number - 1) * self.per_page > MAX_KEY:
+            raise EmptyPage('That page contains no results')
+        return number
+
+    def _slice(self, bottom, top):
+        return list(self.object_list[bottom:top])
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = self._slice(bottom, bottom + self.per_page + 1)
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(
+            rows[:self.per_page], number, self,
+            has_next=len(rows) > self.per_page, has_previous=number > 1,
+        )
+
+    def get_page(self, number):
+        if number == self.LAST:
+            return self.last_page()
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.first_page()
+        except EmptyPage:
+            # The count may be stale or estimated, the last rows are not.
+            return self.last_page()
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Yield page numbers around ``number`` and at both ends.
+
+        Gaps are marked with ``ELLIPSIS``, so the range has a bounded
+        length however many pages there are.
+        """
+        number = max(int(number), 1)
+        num_pages = max(self.num_pages, number)
+        if self.estimated:
+            # Pages past the current one may not exist.
+            if number > 1 + on_each_side + on_ends + 1:
+                yield from range(1, on_ends + 1)
+                yield self.ELLIPSIS
+                yield from range(number - on_each_side, number + 1)
+            else:
+                yield from range(1, number + 1)
+            if number < num_pages:
+                yield self.ELLIPSIS
+            return
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from range(1, num_pages + 1)
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+    def dump_value(self, obj):
+        return self.object_list.model._meta.get_field(
+            self.field
+        ).value_to_string(obj)
+
+    def load_value(self, value):
+        return self.object_list.model._meta.get_field(
+            self.field
+        ).to_python(value)
+
+    def encode_cursor(self, obj, number):
+        payload = json.dumps(
+            [self.dump_value(obj), obj.pk, number], separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            value, pk, number = json.loads(
+                base64.urlsafe_b64decode(padded.encode()).decode()
+            )
+            # Floats such as 1e999 would overflow, and keys past 64 bits
+            # cannot be bound as SQL parameters.
+            if not (isinstance(pk, int) and isinstance(number, int)
+                    and abs(pk) <= MAX_KEY):
+                return None
+            return self.load_value(value), pk, max(number, 1)
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            return None
+
+    def _fetch(self, value=None, pk=None, forward=True):
+        """Return up to ``per_page + 1`` rows past the ``(value, pk)`` key.
+
+        Rows come in page order when ``forward`` and in reverse order
+        otherwise.
+        """
+        queryset = self.object_list
+        if not forward:
+            queryset = queryset.reverse()
+        if value is not None:
+            ascending = self.descending != forward
+            lookup = 'gt' if ascending else 'lt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}e': value}),
+                Q(**{f'{self.field}__{lookup}': value})
+                | Q(**{f'{self.tiebreak}__{lookup}': pk}),
+            )
+        return list(queryset[:self.per_page + 1])
+
+    def first_page(self):
+        rows = self._fetch()
+        return self._get_page(
+            rows[:self.per_page], 1, self,
+            has_next=len(rows) > self.per_page, has_previous=False,
+        )
+
+    def last_page(self):
+        """The last rows, fetched from the end in reverse order.
+
+        An estimated count is replaced by an exact one here, so the page
+        gets its real number and the rows past the previous page.
+        """
+        rows = self._fetch(forward=False)
+        if self.estimated:
+            self.count = self.object_list.count()
+            vars(self).pop('num_pages', None)
+        size = self.count - (self.num_pages - 1) * self.per_page
+        size = min(max(size, 1), self.per_page)
+        return self._get_page(
+            rows[:size][::-1], self.num_pages, self,
+            has_next=False, has_previous=len(rows) > size,
+        )
+
+    def page_after(self, value, pk, number):
+        rows = self._fetch(value, pk, True)
+        return self._get_page(
+            rows[:self.per_page], number, self,
+            has_next=len(rows) > self.per_page, has_previous=True,
+        )
+
+    def page_before(self, value, pk, number):
+        rows = self._fetch(value, pk, False)
+        if len(rows) <= self.per_page:
+            return self.first_page()
+        return self._get_page(
+            rows[:self.per_page][::-1], max(number, 2), self,
+            has_next=True, has_previous=True,
+        )
+
+    def get_cursor_page(self, after=None, before=None, number=None):
+        """Return the page addressed by a cursor token or a page number."""
+        for token, method in ((after, self.page_after),
+                              (before, self.page_before)):
+            cursor = self.decode_cursor(token) if token else None
+            if cursor is not None:
+                return method(*cursor)
+        if number in (None, '', '1', 1):
+            return self.first_page()
+        return self.get_page(number)
+
+
+class FeedPaginator(CursorPaginator):
+    """Paginates a user's inbox rows and yields their posts.
+
+    Posts of authors that are not fanned out on write are passed in as
+    ``pulled`` and merged with the inbox at read time.
+    """
+
+    tiebreak = 'post_id'
+
+    def __init__(self, entries, per_page, pulled=None, **kwargs):
+        super().__init__(
+            entries.select_related('post__author', 'post__group'),
+            per_page, **kwargs
+        )
+        self.pulled = pulled if pulled is None else CursorPaginator(
+            pulled.select_related('author', 'group'), per_page
+        )
+
+    def _merge(self, *streams, forward=True):
+        return sorted(
+            chain(*streams),
+            key=lambda post: (post.pub_date, post.pk),
+            reverse=self.descending == forward,
+        )
+
+    def _fetch(self, value=None, pk=None, forward=True):
+        rows = [entry.post for entry in super()._fetch(value, pk, forward)]
+        if self.pulled is None:
+            return rows
+        return self._merge(
+            rows, self.pulled._fetch(value, pk, forward), forward=forward
+        )[:self.per_page + 1]
+
+    @cached_property
+    def count(self):
+        count = super().count
+        if self.counter is None and self.pulled is not None:
+            count += self.pulled.count
+        return count
+
+    def _slice(self, bottom, top):
+        if self.pulled is None:
+            return [entry.post for entry in self.object_list[bottom:top]]
+        return self._merge(
+            [entry.post for entry in self.object_list[:top]],
+            self.pulled.object_list[:top],
+        )[bottom:top]
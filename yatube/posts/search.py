@@ -0,0 +1,128 @@
+import re
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginators import CursorPaginator
+
+FTS_TABLE = 'posts_post_fts'
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 24
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query of quoted prefix terms."""
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', query))
+
+
+def _execute(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def index_post(post, old_text=None):
+    if old_text is not None:
+        if old_text == post.text:
+            return
+        unindex_post(post, old_text)
+    _execute(
+        f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)',
+        [post.pk, post.text],
+    )
+
+
+def unindex_post(post, text=None):
+    # The index reads from posts_post, so removal must repeat the exact
+    # text that was indexed.
+    _execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+        f"VALUES ('delete', %s, %s)",
+        [post.pk, post.text if text is None else text],
+    )
+
+
+def rebuild():
+    _execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def index_from(first_pk):
+    """Index posts from ``first_pk`` on that were bulk inserted."""
+    _execute(
+        f'INSERT INTO {FTS_TABLE}(rowid, text) '
+        f'SELECT id, text FROM {Post._meta.db_table} WHERE id >= %s',
+        [first_pk],
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Keyset pagination over FTS5 matches ordered by bm25 rank."""
+
+    descending = False
+    field = 'rank'
+
+    def __init__(self, query, per_page, **kwargs):
+        self.match = match_expression(query)
+        Paginator.__init__(self, [], per_page, **kwargs)
+
+    def dump_value(self, obj):
+        return obj.rank
+
+    def load_value(self, value):
+        return float(value)
+
+    @cached_property
+    def count(self):
+        if not self.match:
+            return 0
+        return _execute(
+            f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [self.match],
+        )[0][0]
+
+    def _search(self, where='', params=(), order='', limit=None, offset=0):
+        if not self.match:
+            return []
+        rows = _execute(
+            f'SELECT rowid, rank, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {where} '
+            f'ORDER BY rank {order}, rowid {order} LIMIT %s OFFSET %s',
+            [MARK_START, MARK_END, '…', SNIPPET_TOKENS, self.match,
+             *params, limit, offset],
+        )
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            [row[0] for row in rows]
+        )
+        results = []
+        for pk, rank, snippet in rows:
+            post = posts.get(pk)
+            if post is None:
+                continue
+            post.rank = rank
+            post.snippet = mark_safe(
+                escape(snippet).replace(MARK_START, '<mark>').replace(
+                    MARK_END, '</mark>'
+                )
+            )
+            results.append(post)
+        return results
+
+    def _fetch(self, value=None, pk=None, forward=True):
+        order = '' if forward else 'DESC'
+        where, params = '', ()
+        if value is not None:
+            lookup = '>' if forward else '<'
+            where = (
+                f'AND (rank {lookup} %s '
+                f'OR (rank = %s AND rowid {lookup} %s))'
+            )
+            params = (value, value, pk)
+        return self._search(where, params, order, self.per_page + 1)
+
+    def _slice(self, bottom, top):
+        return self._search(limit=top - bottom, offset=bottom)
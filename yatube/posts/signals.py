@@ -0,0 +1,207 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache, counters, feed, search
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        feed.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        feed.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def cleanup_feed(sender, instance, **kwargs):
+    feed.cleanup(instance.user_id, instance.author_id)
+
+
+def post_scopes(post):
+    scopes = ['global', f'author:{post.author.username}']
+    if post.group_id:
+        scopes.append(f'group:{post.group.slug}')
+    return scopes
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._old_values = Post.objects.filter(
+            pk=instance.pk
+        ).values('text', 'group__slug').first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = post_scopes(instance)
+    old_values = getattr(instance, '_old_values', None) or {}
+    if old_values.get('group__slug'):
+        scopes.append(f'group:{old_values["group__slug"]}')
+    cache.bump(*scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, raw=False, **kwargs):
+    if not raw and instance.post_id:
+        # 'comments' moves the API lists, which carry comment counts.
+        cache.bump(f'post:{instance.post_id}', 'comments')
+
+
+@receiver(post_save, sender=Post)
+def touch_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache.touch_post(
+            instance.pk, instance.updated_at, instance.author.username
+        )
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    cache.forget_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_post(sender, instance, raw=False, **kwargs):
+    if not raw and instance.post_id:
+        cache.touch_post(instance.post_id)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache.bump('global', f'group:{instance.slug}')
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+# What post cards show of their author.
+SHOWN_NAMES = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_old_names(sender, instance, raw=False, update_fields=None,
+                       **kwargs):
+    # Logins save only last_login and need no lookup.
+    if (instance.pk and not raw
+            and (update_fields is None
+                 or set(SHOWN_NAMES) & set(update_fields))):
+        instance._old_names = User.objects.filter(
+            pk=instance.pk
+        ).values(*SHOWN_NAMES).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, raw=False, **kwargs):
+    old_names = getattr(instance, '_old_names', None)
+    instance._old_names = None
+    if raw or not old_names or all(
+        old_names[name] == getattr(instance, name) for name in SHOWN_NAMES
+    ):
+        return
+    groups = Group.objects.filter(groups__author=instance).values_list(
+        'slug', flat=True
+    ).distinct()
+    cache.bump(*dict.fromkeys([
+        'global', f'author:{old_names["username"]}',
+        f'author:{instance.username}',
+        *(f'group:{slug}' for slug in groups),
+    ]))
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.add_posts(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.add_posts(instance.author_id, -1)
+
+
+def count_scopes(group_slug):
+    return ['global'] + ([f'group:{group_slug}'] if group_slug else [])
+
+
+@receiver(post_save, sender=Post)
+def count_paginated_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    group_slug = instance.group.slug if instance.group_id else None
+    if created:
+        counters.add_cached_count(1, *count_scopes(group_slug))
+        return
+    old_values = getattr(instance, '_old_values', None) or {}
+    old_slug = old_values.get('group__slug')
+    if old_slug != group_slug:
+        counters.add_cached_count(-1, *count_scopes(old_slug)[1:])
+        counters.add_cached_count(1, *count_scopes(group_slug)[1:])
+
+
+@receiver(post_delete, sender=Post)
+def uncount_paginated_post(sender, instance, **kwargs):
+    counters.add_cached_count(-1, *count_scopes(
+        instance.group.slug if instance.group_id else None
+    ))
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.post_id:
+        counters.add_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.post_id:
+        counters.add_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follower(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.add_followers(instance.author_id, 1)
+        # The profile page shows the number of followers.
+        cache.bump(f'author:{instance.author.username}')
+
+
+@receiver(post_delete, sender=Follow)
+def count_lost_follower(sender, instance, **kwargs):
+    counters.add_followers(instance.author_id, -1)
+    cache.bump(f'author:{instance.author.username}')
+
+
+@receiver(post_delete, sender=Follow)
+def refill_unpulled_feed(sender, instance, **kwargs):
+    # Runs after count_lost_follower has lowered the counter.
+    feed.unpull(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = None if created else getattr(instance, '_old_values', None)
+    search.index_post(
+        instance, old_values['text'] if old_values else None
+    )
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post_text(sender, instance, **kwargs):
+    search.unindex_post(instance)
@@ -0,0 +1,42 @@
+from hashlib import md5
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from posts.thumbnails import thumbnails_ready
+
+register = template.Library()
+
+CARD_KEY = 'posts:card:{}:{}:{}'
+CARD_TEMPLATE = 'posts/includes/post_list.html'
+
+
+def card_key(post):
+    author = post.author
+    author_stamp = md5(
+        f'{author.username}:{author.get_full_name()}'.encode()
+    ).hexdigest()
+    return CARD_KEY.format(
+        post.pk, post.updated_at.timestamp(), author_stamp
+    )
+
+
+@register.simple_tag
+def prefetch_post_cards(posts):
+    """Fetch the cached cards of a whole page with one ``get_many``."""
+    return cache.get_many([card_key(post) for post in posts])
+
+
+@register.simple_tag
+def post_card(post, cards=None):
+    key = card_key(post)
+    html = (cards or {}).get(key)
+    if html is None:
+        html = get_template(CARD_TEMPLATE).render({'post': post})
+        # Cards rendered with the fallback image are not worth keeping.
+        if not post.image or thumbnails_ready(post.image):
+            cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
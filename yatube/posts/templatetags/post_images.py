@@ -0,0 +1,11 @@
+from django import template
+
+from posts.thumbnails import get_ready_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def ready_thumbnail(file_, geometry, **options):
+    """Return the thumbnail if it was generated already, otherwise None."""
+    return get_ready_thumbnail(file_, geometry, **options)
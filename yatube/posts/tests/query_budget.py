@@ -0,0 +1,20 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assertions for views that must run a fixed number of queries."""
+
+    def assertQueryBudget(self, budget, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            result = func(*args, **kwargs)
+        executed = len(context.captured_queries)
+        if executed > budget:
+            self.fail('{} queries executed, budget is {}:\n{}'.format(
+                executed, budget, '\n'.join(
+                    f'{i}. {query["sql"]}' for i, query in enumerate(
+                        context.captured_queries, start=1
+                    )
+                )
+            ))
+        return result
@@ -0,0 +1,181 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Тестовый пост {i}'
+            ) for i in range(15)
+        ]
+        cls.post = cls.posts[-1]
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_posts_are_compact_json(self):
+        response = self.client.get(reverse('api_v1:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertNotIn(b', ', response.content)
+        self.assertIn('Тестовый пост'.encode(), response.content)
+        data = response.json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['results'][0]['id'], self.post.pk)
+        self.assertEqual(data['results'][0]['author'], 'auth')
+        self.assertEqual(data['results'][0]['group'], 'slug')
+
+    def test_cursor_pagination(self):
+        url = reverse('api_v1:index')
+        first = self.client.get(url).json()
+        second = self.client.get(url, {'after': first['next']}).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+        back = self.client.get(url, {'before': second['previous']}).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_limit(self):
+        url = reverse('api_v1:index')
+        data = self.client.get(url, {'limit': 3}).json()
+        self.assertEqual(len(data['results']), 3)
+        for limit in ('0', '101', 'много'):
+            with self.subTest(limit=limit):
+                response = self.client.get(url, {'limit': limit})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('api_v1:post_detail', kwargs={'post_id': self.post.pk}),
+            {'fields': 'id,text'},
+        )
+        self.assertEqual(
+            response.json(), {'id': self.post.pk, 'text': self.post.text}
+        )
+        response = self.client.get(
+            reverse('api_v1:index'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_batched_ids(self):
+        wanted = [self.posts[3].pk, self.posts[1].pk, 0]
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('api_v1:index'),
+                {'ids': ','.join(map(str, wanted)), 'fields': 'id'},
+            )
+        self.assertEqual(
+            response.json(),
+            {'results': [{'id': wanted[0]}, {'id': wanted[1]}]},
+        )
+        for ids in ('1,x', '9' * 20, f'1,-{2 ** 63}'):
+            with self.subTest(ids=ids):
+                response = self.client.get(
+                    reverse('api_v1:index'), {'ids': ids}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_scoped_lists(self):
+        for url in (
+            reverse('api_v1:group_posts', kwargs={'slug': 'slug'}),
+            reverse('api_v1:profile_posts', kwargs={'username': 'auth'}),
+        ):
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                self.assertEqual(data['results'][0]['id'], self.post.pk)
+
+    def test_profile(self):
+        response = self.client.get(
+            reverse('api_v1:profile', kwargs={'username': 'auth'})
+        )
+        self.assertEqual(response.json()['posts_count'], 15)
+        self.assertEqual(response.json()['followers_count'], 1)
+
+    def test_comments(self):
+        data = self.client.get(reverse(
+            'api_v1:post_comments', kwargs={'post_id': self.post.pk}
+        )).json()
+        self.assertEqual(data['results'][0]['text'], 'Комментарий')
+        self.assertEqual(data['results'][0]['author'], 'reader')
+
+    def test_not_found_is_json(self):
+        for url in (
+            reverse('api_v1:post_detail', kwargs={'post_id': 0}),
+            reverse('api_v1:group_posts', kwargs={'slug': 'missing'}),
+            reverse('api_v1:profile', kwargs={'username': 'missing'}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Not found.'})
+
+    def test_unchanged_list_is_not_modified(self):
+        url = reverse('api_v1:index')
+        response = self.client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_changes_list_etag(self):
+        for url in (
+            reverse('api_v1:index'),
+            reverse('api_v1:group_posts', kwargs={'slug': 'slug'}),
+            reverse('api_v1:profile_posts', kwargs={'username': 'auth'}),
+        ):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                Comment.objects.create(
+                    post=self.post, author=self.reader, text='Ещё один'
+                )
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_post_is_not_modified(self):
+        url = reverse('api_v1:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_follow_feed(self):
+        url = reverse('api_v1:follow_index')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(
+            response.json()['results'][0]['id'], self.post.pk
+        )
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api_v1:index'))
+        self.assertEqual(response.status_code, 405)
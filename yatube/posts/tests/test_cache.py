@@ -0,0 +1,184 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cache import AUTHOR_KEY, MODIFIED_KEY, get_versions
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:gen'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+
+    def test_anonymous_pages_are_cached(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_new_post_invalidates_pages(self):
+        for url in self.urls:
+            self.guest_client.get(url)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Свежий пост'
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_follow_updates_profile(self):
+        url = self.urls[2]
+        self.assertContains(self.guest_client.get(url), 'Подписчиков: 0')
+        follower = User.objects.create_user(username='follower')
+        follow = Follow.objects.create(user=follower, author=self.user)
+        self.assertContains(self.guest_client.get(url), 'Подписчиков: 1')
+        follow.delete()
+        self.assertContains(self.guest_client.get(url), 'Подписчиков: 0')
+
+    def test_author_rename_updates_pages(self):
+        for url in self.urls:
+            self.guest_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Фёдор'
+        user.last_name = 'Достоевский'
+        user.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.guest_client.get(url), 'Фёдор Достоевский'
+                )
+
+    def test_login_keeps_pages(self):
+        user = User.objects.get(pk=self.user.pk)
+        versions = get_versions('global')
+        user.save(update_fields=['last_login'])
+        user.save()
+        self.assertEqual(get_versions('global'), versions)
+
+    def test_deleted_post_disappears(self):
+        post = Post.objects.create(author=self.user, text='Удалённый пост')
+        self.guest_client.get(self.urls[0])
+        post.delete()
+        self.assertNotContains(
+            self.guest_client.get(self.urls[0]), 'Удалённый пост'
+        )
+
+    def test_group_change_invalidates_old_group(self):
+        url = self.urls[1]
+        self.assertContains(self.guest_client.get(url), self.post.text)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = None
+        post.save()
+        self.assertNotContains(self.guest_client.get(url), self.post.text)
+
+    def test_comment_does_not_invalidate_list_pages(self):
+        self.guest_client.get(self.urls[0])
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.urls[0])
+
+    def test_authorized_pages_are_not_cached(self):
+        self.authorized_client.get(self.urls[0])
+        response = self.authorized_client.get(self.urls[0])
+        self.assertIsNotNone(response.context)
+
+
+class PostDetailConditionalTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+
+    def revalidate(self, client, etag):
+        return client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.revalidate(self.client, etag)
+        self.assertEqual(response.status_code, 304)
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_visitors_get_their_own_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.revalidate(self.authorized_client, etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_and_edit_change_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        response = self.revalidate(self.client, etag)
+        self.assertContains(response, 'Комментарий')
+
+        etag = response['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(
+            self.revalidate(self.client, etag), 'Исправленный пост'
+        )
+
+    def test_authors_new_post_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Post.objects.create(author=self.user, text='Второй пост')
+        response = self.revalidate(self.client, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['count'], 2)
+
+    def test_evicted_validator_is_recomputed(self):
+        etag = self.client.get(self.url)['ETag']
+        cache.delete_many([
+            MODIFIED_KEY.format(self.post.pk), AUTHOR_KEY.format(self.post.pk)
+        ])
+        self.assertEqual(self.revalidate(self.client, etag).status_code, 304)
+
+    def test_missing_post(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,308 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.management.commands import (
+    benchmark_views, import_posts, loadtest, seed,
+)
+from posts.cache import get_versions
+from posts.counters import count_key
+from posts.models import AuthorStats, Comment, FeedEntry, Follow, Group, Post
+from posts.search import SearchPaginator
+
+User = get_user_model()
+
+
+class CheckQueryPlansTest(TestCase):
+    def test_view_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All view queries use indexes.', out.getvalue())
+
+    def test_counted_pages_use_indexes(self):
+        # Больше одной страницы, чтобы индекс запрашивал число постов
+        user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Пост №{i}') for i in range(25)
+        )
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All view queries use indexes.', out.getvalue())
+
+    def test_site_cache_is_left_alone(self):
+        cache.clear()
+        versions = get_versions('global')
+        call_command('check_query_plans', stdout=StringIO())
+        self.assertEqual(get_versions('global'), versions)
+        self.assertIsNone(cache.get(count_key('global')))
+
+
+class ReconcileCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Комментарий'
+        )
+
+    def test_drift_is_reported_and_fixed(self):
+        AuthorStats.objects.filter(user=self.user).update(posts_count=7)
+        Post.objects.filter(pk=self.post.pk).update(comments_count=0)
+        out = StringIO()
+        call_command('reconcile_counters', '--dry-run', stdout=out)
+        self.assertIn('Found 2 drifted counters.', out.getvalue())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 7
+        )
+
+        call_command('reconcile_counters', '--batch-size=1', stdout=out)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 1
+        )
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_missing_stats_are_created(self):
+        AuthorStats.objects.filter(user=self.user).delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 1
+        )
+
+
+class SeedTest(TestCase):
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed', scale=0.01, stdout=out, **options)
+        return out.getvalue()
+
+    def test_rows_and_derived_data(self):
+        out = self.seed(seed=1)
+        self.assertIn('rows/s', out)
+        self.assertEqual(
+            User.objects.filter(username__startswith='seed').count(), 10
+        )
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 400)
+        reconcile = StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=reconcile)
+        self.assertIn('Found 0 drifted counters.', reconcile.getvalue())
+        follow = Follow.objects.first()
+        self.assertEqual(
+            FeedEntry.objects.filter(user=follow.user).count(),
+            Post.objects.filter(author__following__user=follow.user).count(),
+        )
+        word = Post.objects.first().text.split()[-1]
+        self.assertTrue(SearchPaginator(word, 10).count)
+
+    def test_same_seed_gives_same_rows(self):
+        def rows(prefix):
+            return list(Post.objects.filter(
+                author__username__startswith=prefix
+            ).order_by('pk').values_list(
+                'text', 'author__username', 'group__slug'
+            ))
+
+        self.seed(seed=1, prefix='a')
+        self.seed(seed=1, prefix='b')
+        self.assertEqual(
+            [(text, author[1:], group and group[1:])
+             for text, author, group in rows('a')],
+            [(text, author[1:], group and group[1:])
+             for text, author, group in rows('b')],
+        )
+
+    def test_existing_prefix_is_refused(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_keys_of_deleted_rows_are_not_reused(self):
+        user = User.objects.create_user(username='removed')
+        Post.objects.create(author=user, text='Удалённый пост').delete()
+        Group.objects.create(title='Удалённая', slug='removed').delete()
+        user.delete()
+        self.seed(seed=1)
+        self.assertEqual(Post.objects.count(), 200)
+        reconcile = StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=reconcile)
+        self.assertIn('Found 0 drifted counters.', reconcile.getvalue())
+
+    def test_failed_run_leaves_no_rows(self):
+        with mock.patch.object(
+            seed.Command, 'seed_posts', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.seed()
+        self.assertFalse(User.objects.exists())
+        self.seed()
+
+
+class BenchmarkViewsTest(TestCase):
+    def compare(self, row, tolerance=benchmark_views.TOLERANCE):
+        baseline = {'view': 'gen', 'scale': 1.0, 'queries': 3, 'p95_ms': 10}
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as path:
+            json.dump({'results': [baseline]}, path)
+            path.flush()
+            command = benchmark_views.Command(stderr=StringIO())
+            command.compare([{**baseline, **row}], path.name, tolerance)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark_views.percentile(values, 0.5), 50)
+        self.assertEqual(benchmark_views.percentile(values, 0.99), 99)
+        self.assertEqual(benchmark_views.percentile([7], 0.95), 7)
+
+    def test_nested_renders_are_timed_once(self):
+        author = User.objects.create_user(username='auth')
+        Post.objects.create(author=author, text='Пост с карточкой')
+        cache.clear()
+        timings = []
+        with benchmark_views.timed_renders(timings):
+            self.client.get(reverse('posts:gen'))
+        self.assertEqual(len(timings), 1)
+
+    def test_baseline_comparison(self):
+        self.compare({'p95_ms': 12})
+        for row in ({'queries': 4}, {'p95_ms': 20}):
+            with self.subTest(row=row):
+                with self.assertRaises(CommandError):
+                    self.compare(row)
+
+    def test_latency_is_only_compared_on_request(self):
+        self.compare({'p95_ms': 20}, tolerance=None)
+        with self.assertRaises(CommandError):
+            self.compare({'queries': 4}, tolerance=None)
+
+
+class LoadTestTest(TestCase):
+    def test_mix_is_parsed(self):
+        command = loadtest.Command()
+        self.assertEqual(
+            command.parse_mix('read=3,post=1'), {'read': 3, 'post': 1}
+        )
+        for mix in ('read', 'read=3,delete=1'):
+            with self.subTest(mix=mix):
+                with self.assertRaises(CommandError):
+                    command.parse_mix(mix)
+
+    def test_report(self):
+        stats = loadtest.Stats()
+        for elapsed in (0.004, 0.02, 0.02, 7):
+            stats.add('gen', elapsed)
+        report = stats.report(2)
+        self.assertEqual(report['rps'], 2)
+        self.assertEqual(report['error_rate'], 1)
+        self.assertEqual(
+            report['endpoints']['gen']['histogram'],
+            [1, 0, 2, 0, 0, 0, 0, 0, 0, 0, 1],
+        )
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def write(self, suffix, content):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, delete=False, encoding='utf-8'
+        ) as input_file:
+            input_file.write(content)
+        self.addCleanup(os.remove, input_file.name)
+        return input_file.name
+
+    def ndjson(self, *records):
+        return self.write('.ndjson', ''.join(
+            json.dumps(record) + '\n' for record in records
+        ))
+
+    def import_posts(self, path, **options):
+        out = StringIO()
+        call_command('import_posts', path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_posts_and_comments_are_imported(self):
+        path = self.ndjson(
+            {'type': 'post', 'id': 'a', 'author': 'author',
+             'text': 'Первый импортированный', 'pub_date': '2020-01-01T10:00'},
+            {'type': 'comment', 'post': 'a', 'author': 'follower',
+             'text': 'Комментарий'},
+            {'type': 'post', 'id': 'b', 'author': 'nobody', 'text': 'Нет'},
+        )
+        out = self.import_posts(path, batch_size=2, defer_indexes=True)
+        self.assertIn('Imported 2 records, skipped 1', out)
+        post = Post.objects.get(text='Первый импортированный')
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).posts_count, 1
+        )
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.follower, post=post).exists()
+        )
+        self.assertEqual(SearchPaginator('импортированный', 10).count, 1)
+
+    def test_keys_of_deleted_posts_are_not_reused(self):
+        Post.objects.create(author=self.author, text='Старый пост')
+        Post.objects.create(author=self.author, text='Удалённый').delete()
+        path = self.ndjson(*(
+            {'type': 'post', 'id': str(i), 'author': 'author',
+             'text': f'Новый пост {i}'} for i in range(3)
+        ), {'type': 'comment', 'post': '2', 'author': 'follower',
+            'text': 'К последнему'})
+        self.assertIn('Imported 4 records', self.import_posts(path))
+        self.assertEqual(
+            Comment.objects.get(text='К последнему').post.text, 'Новый пост 2'
+        )
+
+    def test_csv_creates_missing_authors_and_groups(self):
+        path = self.write(
+            '.csv',
+            'type,id,author,group,text\n'
+            'post,1,newcomer,new-group,Пост из CSV\n',
+        )
+        self.import_posts(path, create_missing=True)
+        post = Post.objects.get(text='Пост из CSV')
+        self.assertEqual(post.author.username, 'newcomer')
+        self.assertEqual(post.group.slug, 'new-group')
+        self.assertEqual(post.author.stats.posts_count, 1)
+
+    def test_import_resumes_from_checkpoint(self):
+        records = [
+            {'type': 'post', 'id': str(i), 'author': 'author',
+             'text': f'Пост №{i}'} for i in range(4)
+        ] + [{'type': 'comment', 'post': '1', 'author': 'author',
+              'text': 'Комментарий'}]
+        checkpoint = self.write('.ndjson', '')
+        path = self.ndjson(*records[:2])
+        # Первый запуск обрывается до обновления счётчиков
+        with mock.patch.object(
+            import_posts.Command, 'finish', side_effect=KeyboardInterrupt
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.import_posts(path, checkpoint=checkpoint)
+
+        out = self.import_posts(
+            self.ndjson(*records), checkpoint=checkpoint, batch_size=2
+        )
+        self.assertIn('Imported 5 records', out)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Post.objects.get(text='Пост №1').comments_count, 1)
+        self.assertIn(
+            'already finished',
+            self.import_posts(path, checkpoint=checkpoint),
+        )
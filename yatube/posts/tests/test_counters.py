@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import estimated_count, recount_author
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.follower = User.objects.create_user(username='follower')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.follower)
+
+    def stats(self):
+        return AuthorStats.objects.get(user=self.user)
+
+    def test_posts_count(self):
+        post = Post.objects.create(author=self.user, text='Тестовый пост')
+        Post.objects.create(author=self.user, text='Второй пост')
+        self.assertEqual(self.stats().posts_count, 2)
+        post.delete()
+        self.assertEqual(self.stats().posts_count, 1)
+
+    def test_comments_count(self):
+        post = Post.objects.create(author=self.user, text='Тестовый пост')
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': 'Комментарий'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.get(post=post).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_followers_count(self):
+        kwargs = {'username': self.user.username}
+        self.authorized_client.get(reverse('posts:profile_follow',
+                                           kwargs=kwargs))
+        self.authorized_client.get(reverse('posts:profile_follow',
+                                           kwargs=kwargs))
+        self.assertEqual(self.stats().followers_count, 1)
+        self.authorized_client.get(reverse('posts:profile_unfollow',
+                                           kwargs=kwargs))
+        self.assertEqual(self.stats().followers_count, 0)
+
+    def test_deleting_author_keeps_counters_consistent(self):
+        author = User.objects.create_user(username='leaving')
+        Post.objects.create(author=author, text='Тестовый пост')
+        author_pk = author.pk
+        author.delete()
+        self.assertFalse(AuthorStats.objects.filter(pk=author_pk).exists())
+
+    def test_missing_stats_row_is_rebuilt(self):
+        Post.objects.create(author=self.user, text='Тестовый пост')
+        AuthorStats.objects.filter(user=self.user).delete()
+        Post.objects.create(author=self.user, text='Второй пост')
+        self.assertEqual(self.stats().posts_count, 2)
+
+
+class PaginatorCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Пост №{i}')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:gen'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+        )
+
+    def page_count(self, url, **params):
+        response = self.authorized_client.get(url, params)
+        return response.context['page_obj'].paginator.count
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(url, params)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+
+    def test_counts_are_cached(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.page_count(url), 25)
+                self.assertEqual(self.count_queries(url), [])
+                self.assertEqual(self.count_queries(url, page=3), [])
+
+    def test_counts_follow_post_changes(self):
+        for url in self.urls:
+            self.page_count(url)
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        self.assertEqual(
+            [self.page_count(url) for url in self.urls], [26, 26]
+        )
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(
+            [self.page_count(url) for url in self.urls], [26, 25]
+        )
+        post.delete()
+        self.assertEqual(
+            [self.page_count(url) for url in self.urls], [25, 25]
+        )
+
+    def test_global_count_is_estimated(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Без сигналов №{i}')
+            for i in range(5)
+        )
+        self.assertEqual(self.page_count(self.urls[0]), 25)
+
+    def test_unanalyzed_count_comes_from_the_primary_key(self):
+        with self.assertNumQueries(2):
+            count = estimated_count(Post.objects.all())
+        self.assertEqual(count, Post.objects.latest('pk').pk)
+
+    def test_page_past_the_end(self):
+        page = self.authorized_client.get(
+            self.urls[0], {'page': 10}
+        ).context['page_obj']
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+
+    def test_feed_is_counted_from_author_stats(self):
+        recount_author(self.user.pk)
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        self.authorized_client.force_login(follower)
+        url = reverse('posts:follow_index')
+        self.assertEqual(self.page_count(url), 25)
+        self.assertEqual(self.count_queries(url), [])
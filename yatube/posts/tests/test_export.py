@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        for day in range(1, 6):
+            post = Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Пост за {day} января',
+                image='posts/small.gif' if day == 1 else '',
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(datetime(2021, 1, day, 12))
+            )
+        cls.first = Post.objects.get(text='Пост за 1 января')
+        Comment.objects.create(post=cls.first, author=cls.user, text='Да')
+
+    def export(self, name, **params):
+        kwargs = (
+            {'username': self.user.username} if name == 'profile_export'
+            else {'slug': self.group.slug}
+        )
+        return self.client.get(reverse(f'posts:{name}', kwargs=kwargs), params)
+
+    def test_ndjson_export(self):
+        for name in ('profile_export', 'group_export'):
+            with self.subTest(name=name):
+                response = self.export(name)
+                self.assertTrue(response.streaming)
+                rows = [
+                    json.loads(line) for line in b''.join(
+                        response.streaming_content
+                    ).decode().splitlines()
+                ]
+                self.assertEqual(len(rows), 5)
+                self.assertEqual(rows[0]['text'], self.first.text)
+                self.assertEqual(rows[0]['comments_count'], 1)
+                self.assertEqual(
+                    rows[0]['image'], 'http://testserver/media/posts/small.gif'
+                )
+                self.assertEqual(rows[1]['image'], '')
+
+    def test_csv_export_with_range(self):
+        response = self.export(
+            'profile_export', format='csv',
+            since='2021-01-02', until='2021-01-04T12:00:00',
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            ['Пост за 2 января', 'Пост за 3 января'],
+        )
+        self.assertEqual(rows[0]['group'], self.group.slug)
+
+    def test_after_continues_without_repeating_rows(self):
+        fourth = Post.objects.get(text='Пост за 4 января')
+        twin = Post.objects.create(author=self.user, text='Ещё пост')
+        Post.objects.filter(pk=twin.pk).update(pub_date=fourth.pub_date)
+        response = self.export('profile_export', since='2021-01-04')
+        rows = [
+            json.loads(line) for line in b''.join(
+                response.streaming_content
+            ).decode().splitlines()
+        ]
+        self.assertEqual(
+            [row['text'] for row in rows],
+            ['Пост за 4 января', 'Ещё пост', 'Пост за 5 января'],
+        )
+        for done in range(1, 3):
+            with self.subTest(done=done):
+                last = rows[done - 1]
+                response = self.export(
+                    'profile_export', after=f"{last['pub_date']},{last['id']}"
+                )
+                self.assertEqual(
+                    [
+                        json.loads(line)['id'] for line in b''.join(
+                            response.streaming_content
+                        ).decode().splitlines()
+                    ],
+                    [row['id'] for row in rows[done:]],
+                )
+
+    def test_bad_parameters(self):
+        for params in (
+            {'format': 'xml'}, {'since': 'вчера'}, {'after': '2021-01-01'},
+            {'after': '2021-01-01,x'}, {'after': f',{self.first.pk}'},
+            {'after': f'2021-01-01,{2**63}'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.export('group_export', **params).status_code, 400
+                )
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            'export_posts', author=self.user.username, since='2021-01-05',
+            stdout=out,
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['text'] for row in rows], ['Пост за 5 января'])
+        self.assertEqual(rows[0]['type'], 'post')
+
+    def test_command_after(self):
+        fourth = Post.objects.get(text='Пост за 4 января')
+        out = StringIO()
+        call_command(
+            'export_posts', author=self.user.username,
+            after=f'{fourth.pub_date.isoformat()},{fourth.pk}', stdout=out,
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['text'] for row in rows], ['Пост за 5 января'])
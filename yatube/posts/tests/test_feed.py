@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.star = User.objects.create_user(username='star')
+        for i in range(3):
+            Post.objects.create(author=cls.author, text=f'Старый пост №{i}')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def feed(self, **params):
+        response = self.authorized_client.get(
+            reverse('posts:follow_index'), params
+        )
+        return response.context['page_obj']
+
+    def test_follow_backfills_and_unfollow_cleans_inbox(self):
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author.username}
+        ))
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.user).count(), 3
+        )
+        self.assertEqual(len(self.feed()), 3)
+
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.author.username}
+        ))
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(len(self.feed()), 0)
+
+    def test_new_post_is_fanned_out(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        author_client = Client()
+        author_client.force_login(self.author)
+        author_client.post(reverse('posts:post_create'), {'text': 'Новый'})
+        post = Post.objects.get(text='Новый')
+        self.assertTrue(
+            FeedEntry.objects.filter(user=self.user, post=post).exists()
+        )
+        self.assertEqual(self.feed()[0], post)
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popular_author_is_pulled_at_read_time(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=self.user, author=self.star)
+        Follow.objects.create(user=self.author, author=self.star)
+        for i in range(12):
+            Post.objects.create(author=self.star, text=f'Пост звезды №{i}')
+        self.assertFalse(
+            FeedEntry.objects.filter(author=self.star).exists()
+        )
+        expected = list(Post.objects.filter(
+            author__in=[self.author, self.star]
+        ).order_by('-pub_date', '-pk'))
+
+        first = self.feed()
+        second = self.feed(after=first.next_cursor)
+        self.assertEqual(list(first) + list(second), expected)
+        self.assertEqual(list(self.feed(page=2)), expected[10:])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_author_dropping_to_the_limit_is_fanned_out_again(self):
+        Follow.objects.create(user=self.user, author=self.star)
+        Follow.objects.create(user=self.author, author=self.star)
+        post = Post.objects.create(author=self.star, text='Пост звезды')
+        self.assertFalse(FeedEntry.objects.filter(author=self.star).exists())
+
+        Follow.objects.get(user=self.author, author=self.star).delete()
+        page = self.feed()
+        self.assertEqual(list(page), [post])
+        self.assertEqual(page.paginator.count, 1)
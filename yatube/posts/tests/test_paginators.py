@@ -0,0 +1,172 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+from posts.paginators import CursorPaginator
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for i in range(25):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост №{i}',
+            )
+        # Половина постов с одинаковой датой, чтобы проверить сортировку по id
+        same_date = timezone.now()
+        Post.objects.filter(
+            pk__in=Post.objects.order_by('pk').values('pk')[5:15]
+        ).update(pub_date=same_date)
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_walk_forward_and_back(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_cursor_page()
+        pages = [page]
+        while page.has_next():
+            page = paginator.get_cursor_page(after=page.next_cursor)
+            pages.append(page)
+        self.assertEqual(
+            [post for page in pages for post in page], self.expected
+        )
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.get_cursor_page(before=pages[2].previous_cursor)
+        self.assertEqual(list(back), list(pages[1]))
+        self.assertEqual(back.number, 2)
+        first = paginator.get_cursor_page(before=back.previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_cursor_page_uses_single_query(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        token = paginator.get_cursor_page().next_cursor
+        with self.assertNumQueries(1):
+            page = paginator.get_cursor_page(after=token)
+            self.assertTrue(page.has_next())
+            self.assertEqual(page.next_page_number(), 3)
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        page = paginator.get_cursor_page(after='не-курсор')
+        self.assertEqual(page.number, 1)
+        self.assertEqual(list(page), self.expected[:10])
+
+    def test_malformed_cursors_return_first_page(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        value = paginator.dump_value(self.expected[0])
+        for payload in (
+            f'["{value}",1e999,2]', f'["{value}",1,1e999]',
+            f'["{value}",{2 ** 70},2]', f'["{value}","1",2]',
+            f'["{value}",1]', '{}',
+        ):
+            token = base64.urlsafe_b64encode(payload.encode()).decode()
+            with self.subTest(payload=payload):
+                page = paginator.get_cursor_page(after=token)
+                self.assertEqual(page.number, 1)
+                response = self.client.get(reverse('posts:gen'), {
+                    'before': token
+                })
+                self.assertEqual(response.status_code, 200)
+
+    def test_huge_page_number_falls_back_to_last_page(self):
+        for url, params in (
+            (reverse('posts:gen'), {}),
+            (reverse('posts:search'), {'q': 'Пост'}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, {'page': '9' * 21, **params}
+                )
+                self.assertEqual(response.status_code, 200)
+                page = response.context['page_obj']
+                self.assertEqual(page.number, page.paginator.num_pages)
+
+    def test_overestimated_count_serves_the_real_last_page(self):
+        # Без ANALYZE главная оценивает число постов по наибольшему id
+        Post.objects.filter(
+            pk__in=[post.pk for post in self.expected[-10:]]
+        ).delete()
+        last = self.expected[10:15]
+        for page in ('3', 'last'):
+            with self.subTest(page=page):
+                response = self.client.get(reverse('posts:gen'), {
+                    'page': page
+                })
+                page_obj = response.context['page_obj']
+                self.assertEqual(list(page_obj), last)
+                self.assertEqual(page_obj.number, 2)
+                self.assertFalse(page_obj.has_next())
+                self.assertNotContains(response, 'page=3"')
+
+    def test_estimated_page_range_stops_at_the_current_page(self):
+        paginator = CursorPaginator(Post.objects.all(), 1, estimated=True)
+        dots = CursorPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)), [1, dots]
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(12)),
+            [1, dots, 10, 11, 12, dots],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(25)),
+            [1, dots, 23, 24, 25],
+        )
+
+    def test_view_follows_cursor_links(self):
+        response = self.client.get(reverse('posts:gen'))
+        token = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?after={token}')
+        response = self.client.get(reverse('posts:gen'), {'after': token})
+        self.assertEqual(
+            list(response.context['page_obj']), self.expected[10:20]
+        )
+
+    def test_elided_page_range(self):
+        paginator = CursorPaginator(Post.objects.all(), 1)
+        dots = CursorPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, dots, 25],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(12)),
+            [1, dots, 10, 11, 12, 13, 14, dots, 25],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(25)),
+            [1, dots, 23, 24, 25],
+        )
+        self.assertEqual(
+            list(CursorPaginator(Post.objects.all(), 10)
+                 .get_elided_page_range(2)),
+            [1, 2, 3],
+        )
+
+    def test_paginator_links_are_elided(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=self.user, group=group, text=f'Ещё пост №{i}')
+            for i in range(225)
+        )
+        response = self.client.get(
+            reverse('posts:group_posts', kwargs={'slug': group.slug})
+        )
+        self.assertContains(response, CursorPaginator.ELLIPSIS, count=1)
+        self.assertNotContains(response, 'page=10"')
+        self.assertContains(response, 'page=23"')
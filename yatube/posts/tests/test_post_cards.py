@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        for i in range(10):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост №{i}',
+                image=SimpleUploadedFile(
+                    name='small.gif',
+                    content=small_gif,
+                    content_type='image/gif'
+                ),
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_warm_page_renders_cards_from_cache(self):
+        url = reverse('posts:gen')
+        self.authorized_client.get(url)
+        # Сессия, пользователь и одна выборка постов
+        with self.assertNumQueries(3):
+            response = self.authorized_client.get(url)
+        self.assertContains(response, 'Лев Толстой', count=10)
+
+    def test_cards_are_shared_between_views(self):
+        self.authorized_client.get(reverse('posts:gen'))
+        # Карточки уже в кэше: запросов к хранилищу миниатюр нет
+        with self.assertNumQueries(5):
+            self.authorized_client.get(reverse(
+                'posts:profile', kwargs={'username': self.user.username}
+            ))
+
+    def test_edit_refreshes_card(self):
+        url = reverse('posts:gen')
+        self.authorized_client.get(url)
+        post = Post.objects.first()
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Исправленный текст'}
+        )
+        self.assertContains(self.authorized_client.get(url),
+                            'Исправленный текст')
+
+    def test_author_rename_refreshes_cards(self):
+        url = reverse('posts:gen')
+        self.authorized_client.get(url)
+        self.user.first_name = 'Фёдор'
+        self.user.last_name = 'Достоевский'
+        self.user.save()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Фёдор Достоевский', count=10)
+        self.assertNotContains(response, 'Лев Толстой')
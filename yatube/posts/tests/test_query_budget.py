@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+from .query_budget import QueryBudgetMixin
+
+User = get_user_model()
+
+# Сессия и пользователь входят в бюджет каждой страницы,
+# списки считают записи для номеров страниц в паджинаторе
+# (кэш счётчиков пуст, главная ещё проверяет статистику таблицы),
+# страница поста с пустым кэшем читает автора поста для ETag
+BUDGETS = {
+    'posts:gen': 5,
+    'posts:group_posts': 5,
+    'posts:profile': 6,
+    'posts:post_detail': 5,
+    'posts:follow_index': 5,
+    'posts:post_create': 3,
+    'posts:post_edit': 4,
+}
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group{i}', description='Описание'
+            ) for i in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.groups[0], text='Пост читателя'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def add_rows(self, count):
+        for i in range(count):
+            Post.objects.create(
+                author=self.authors[i % 3],
+                group=self.groups[i % 3],
+                text=f'Пост №{i}',
+            )
+            Comment.objects.create(
+                post=self.post, author=self.authors[i % 3], text=f'№{i}'
+            )
+
+    def urls(self):
+        return {
+            'posts:gen': reverse('posts:gen'),
+            'posts:group_posts': reverse(
+                'posts:group_posts', kwargs={'slug': self.groups[0].slug}
+            ),
+            'posts:profile': reverse(
+                'posts:profile', kwargs={'username': self.authors[0]}
+            ),
+            'posts:post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.pk}
+            ),
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:post_create': reverse('posts:post_create'),
+            'posts:post_edit': reverse(
+                'posts:post_edit', kwargs={'post_id': self.post.pk}
+            ),
+        }
+
+    def test_views_stay_within_budget(self):
+        for rows in (2, 30):
+            self.add_rows(rows)
+            for name, url in self.urls().items():
+                with self.subTest(view=name, rows=rows):
+                    response = self.assertQueryBudget(
+                        BUDGETS[name], self.authorized_client.get, url
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_add_comment_within_budget(self):
+        self.add_rows(20)
+        self.assertQueryBudget(
+            5, self.authorized_client.post,
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Комментарий'},
+        )
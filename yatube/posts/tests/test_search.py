@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Котики <b>правят</b> интернетом'
+        )
+        for i in range(12):
+            Post.objects.create(
+                author=cls.user, text=f'Про собак и котов, часть {i}'
+            )
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+
+    def test_search_finds_and_highlights(self):
+        response = self.search('котик')
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), [self.post])
+        self.assertContains(response, '<mark>Котики</mark>')
+        self.assertContains(response, '&lt;b&gt;правят&lt;/b&gt;')
+
+    def test_search_pages_by_cursor(self):
+        first = self.search('собак').context['page_obj']
+        self.assertEqual(len(first), 10)
+        second = self.search(
+            'собак', after=first.next_cursor
+        ).context['page_obj']
+        self.assertEqual(len(second), 2)
+        self.assertFalse(second.has_next())
+        back = self.search(
+            'собак', before=second.previous_cursor
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertEqual(
+            list(self.search('собак', page=2).context['page_obj']),
+            list(second)
+        )
+
+    def test_index_follows_edits_and_deletes(self):
+        post = Post.objects.create(author=self.user, text='Бегемот')
+        post.text = 'Жираф'
+        post.save()
+        self.assertEqual(len(self.search('бегемот').context['page_obj']), 0)
+        self.assertEqual(list(self.search('жираф').context['page_obj']),
+                         [post])
+        post.delete()
+        self.assertEqual(len(self.search('жираф').context['page_obj']), 0)
+
+    def test_query_syntax_is_escaped(self):
+        response = self.search('"котик* (')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO posts_post_fts(posts_post_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertEqual(len(self.search('котик').context['page_obj']), 0)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('котик').context['page_obj']), 1)
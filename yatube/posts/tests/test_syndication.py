@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.urls = {
+            name: reverse(f'posts:{name}', kwargs=kwargs)
+            for name, kwargs in (
+                ('index_rss', {}),
+                ('index_atom', {}),
+                ('group_rss', {'slug': self.group.slug}),
+                ('group_atom', {'slug': self.group.slug}),
+                ('profile_rss', {'username': self.user.username}),
+                ('profile_atom', {'username': self.user.username}),
+            )
+        }
+
+    def test_feeds_list_posts(self):
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, self.post.text)
+                self.assertIn(
+                    'atom' if name.endswith('atom') else 'rss',
+                    response['Content-Type'],
+                )
+                self.assertTrue(response.has_header('ETag'))
+
+    def test_unchanged_feed_is_not_modified(self):
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_last_modified(self):
+        url = self.urls['index_rss']
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_and_delete_change_last_modified(self):
+        url = self.urls['profile_rss']
+        post = Post.objects.create(author=self.user, text='Черновик')
+        last_modified = self.client.get(url)['Last-Modified']
+        for minutes, change in enumerate((post.save, post.delete), 1):
+            with self.subTest(change=change.__name__):
+                with mock.patch('posts.cache.timezone') as clock:
+                    clock.now.return_value = (
+                        timezone.now() + timedelta(minutes=minutes)
+                    )
+                    change()
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_new_post_changes_etag(self):
+        etags = {name: self.client.get(url)['ETag']
+                 for name, url in self.urls.items()}
+        Post.objects.create(
+            author=self.user, group=self.group, text='Свежий пост'
+        )
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertContains(response, 'Свежий пост')
+
+    def test_unknown_group_feed(self):
+        response = self.client.get(
+            reverse('posts:group_rss', kwargs={'slug': 'nothing'})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.thumbnails import (
+    generate_thumbnails, get_ready_thumbnail, thumbnails_ready,
+)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=small_gif,
+                content_type='image/gif'
+            ),
+        )
+
+    def test_pending_thumbnail_falls_back_to_original(self):
+        response = self.authorized_client.get(reverse('posts:gen'))
+        self.assertFalse(thumbnails_ready(self.post.image))
+        self.assertContains(response, f'src="{self.post.image.url}"')
+        self.assertNotContains(response, 'src="/media/cache/')
+
+    def test_generated_thumbnail_is_used(self):
+        generate_thumbnails(self.post)
+        self.assertTrue(thumbnails_ready(self.post.image))
+        for url in (reverse('posts:gen'), reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.pk})):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, 'src="/media/cache/')
+
+    def test_backfill_command(self):
+        out = StringIO()
+        call_command('generate_thumbnails', '--workers=1', stdout=out)
+        self.assertIn('Generated thumbnails for 1 posts.', out.getvalue())
+        self.assertTrue(thumbnails_ready(self.post.image))
+        call_command('generate_thumbnails', '--workers=1', stdout=out)
+        self.assertIn('Generated thumbnails for 0 posts.', out.getvalue())
+
+    def test_force_regenerates_existing_thumbnails(self):
+        generate_thumbnails(self.post)
+        geometry, options = settings.POST_THUMBNAILS[0]
+        name = get_ready_thumbnail(self.post.image, geometry, **options).name
+        path = os.path.join(TEMP_MEDIA_ROOT, name)
+        with open(path, 'wb') as thumbnail:
+            thumbnail.write(b'broken')
+        call_command(
+            'generate_thumbnails', '--workers=1', '--force', stdout=StringIO()
+        )
+        with open(path, 'rb') as thumbnail:
+            self.assertNotEqual(thumbnail.read(), b'broken')
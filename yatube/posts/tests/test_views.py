@@ -272,6 +272,16 @@ class FollowViewsTest(TestCase):
         response = self.authorized_client3.get(reverse('posts:follow_index'))
         self.assertEqual(len(response.context['page_obj']), 0)
 
+    def test_follow_is_idempotent(self):
+        url = reverse('posts:profile_follow',
+                      kwargs={'username': self.user2.username})
+        self.authorized_client.get(url)
+        self.authorized_client.get(url)
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=self.user2).count(),
+            1
+        )
+
 
 class CommentViewsTest(TestCase):
 
@@ -299,3 +309,41 @@ class CommentViewsTest(TestCase):
         response = self.authorized_client.get(reverse(
             'posts:post_detail', kwargs={'post_id': self.govnopost.id}))
         self.assertEqual(response.context.get('comments')[0], self.comment)
+
+
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        for i in range(45):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий №{i}'
+            )
+        cls.expected = list(Comment.objects.order_by('created', 'pk'))
+
+    def test_first_page_is_inline(self):
+        response = self.client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        ))
+        page = response.context['comments']
+        self.assertEqual(list(page), self.expected[:20])
+        self.assertContains(response, page.next_cursor)
+
+    def test_fragment_pages(self):
+        comments = []
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        page = self.client.get(url).context['comments']
+        comments.extend(page)
+        while page.has_next():
+            response = self.client.get(
+                reverse('posts:post_comments',
+                        kwargs={'post_id': self.post.pk}),
+                {'after': page.next_cursor},
+            )
+            self.assertTemplateNotUsed(response, 'base.html')
+            page = response.context['comments']
+            comments.extend(page)
+        self.assertEqual(comments, self.expected)
+        self.assertNotContains(response, 'data-more-comments')
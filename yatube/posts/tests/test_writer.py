@@ -0,0 +1,115 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import writer
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(WRITE_QUEUE=True)
+class WriterTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(author=self.author, text='Пост')
+
+    def write_blocked(self, release):
+        """Keep the writer busy until ``release`` is set."""
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=writer.write, args=(block,))
+        thread.start()
+        started.wait(5)
+        return thread
+
+    def test_queued_writes_share_a_batch(self):
+        release = threading.Event()
+        blocker = self.write_blocked(release)
+        batches = []
+        commit = writer._commit
+
+        def record(jobs):
+            batches.append(len(jobs))
+            commit(jobs)
+
+        texts = [f'Комментарий {i}' for i in range(10)]
+        threads = [
+            threading.Thread(target=writer.write, args=(Comment(
+                post=self.post, author=self.user, text=text
+            ).save,)) for text in texts
+        ]
+        with mock.patch('posts.writer._commit', record):
+            for thread in threads:
+                thread.start()
+            while writer._queue.qsize() < len(threads):
+                threading.Event().wait(0.01)
+            release.set()
+            for thread in threads + [blocker]:
+                thread.join(5)
+        self.assertEqual(batches, [10])
+        self.assertCountEqual(
+            Comment.objects.values_list('text', flat=True), texts
+        )
+
+    def test_results_and_errors_reach_the_caller(self):
+        follow, created = writer.write(
+            Follow.objects.get_or_create, user=self.user, author=self.author
+        )
+        self.assertTrue(created)
+        with self.assertRaises(IntegrityError):
+            writer.write(
+                Follow.objects.create, user=self.user, author=self.author
+            )
+        self.assertEqual(
+            writer.write(Follow.objects.filter(pk=follow.pk).delete)[0], 1
+        )
+
+    @override_settings(WRITE_QUEUE_TIMEOUT=0.01)
+    def test_caller_writes_when_the_queue_is_slow(self):
+        release = threading.Event()
+        blocker = self.write_blocked(release)
+        try:
+            self.assertEqual(
+                writer.write(threading.get_ident), threading.get_ident()
+            )
+        finally:
+            release.set()
+            blocker.join(5)
+
+    def test_views_write_through_the_queue(self):
+        self.client.force_login(self.user)
+        with mock.patch(
+            'posts.writer._commit', wraps=writer._commit
+        ) as commit:
+            self.client.post(
+                reverse('posts:add_comment', args=[self.post.pk]),
+                {'text': 'Комментарий'},
+            )
+            self.client.get(
+                reverse('posts:profile_follow', args=[self.author.username])
+            )
+        self.assertEqual(commit.call_count, 2)
+        self.assertTrue(Comment.objects.filter(text='Комментарий').exists())
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    @override_settings(WRITE_QUEUE=False)
+    def test_disabled(self):
+        self.assertEqual(
+            writer.write(threading.get_ident), threading.get_ident()
+        )
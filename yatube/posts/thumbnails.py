@@ -0,0 +1,103 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.THUMBNAIL_QUEUE_SIZE)
+
+
+class ReadyThumbnailBackend(ThumbnailBackend):
+    """Looks thumbnails up without ever generating them."""
+
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        if not file_:
+            return None
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = ReadyThumbnailBackend()
+
+
+def get_ready_thumbnail(file_, geometry_string, **options):
+    return backend.get_ready_thumbnail(file_, geometry_string, **options)
+
+
+def thumbnails_ready(file_):
+    return all(
+        get_ready_thumbnail(file_, geometry, **options)
+        for geometry, options in settings.POST_THUMBNAILS
+    )
+
+
+def generate_thumbnails(post, force=False):
+    """Create the post's thumbnails; with ``force`` existing ones too."""
+    for geometry, options in settings.POST_THUMBNAILS:
+        if force:
+            # get_thumbnail returns whatever the kvstore knows of.
+            thumbnail = get_ready_thumbnail(post.image, geometry, **options)
+            if thumbnail is not None:
+                thumbnail.delete()
+                default.kvstore.delete(thumbnail)
+        get_thumbnail(post.image, geometry, **options)
+
+
+def _generate(post_id):
+    try:
+        post = Post.objects.filter(pk=post_id).first()
+        if post is not None and post.image:
+            generate_thumbnails(post)
+    except Exception:
+        logger.exception('Thumbnails for post %s failed', post_id)
+    finally:
+        _slots.release()
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def _submit(post_id):
+    if not _slots.acquire(blocking=False):
+        logger.warning('Thumbnail queue is full, post %s skipped', post_id)
+        return
+    _get_executor().submit(_generate, post_id)
+
+
+def schedule(post):
+    """Generate the post's thumbnails in the background after commit.
+
+    The queue is bounded; posts that do not fit are rendered from the
+    original image until ``generate_thumbnails`` picks them up.
+    """
+    transaction.on_commit(lambda: _submit(post.pk))
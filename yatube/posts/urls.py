@@ -2,19 +2,35 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='gen'),
+    path('rss/', feeds.LatestPostsFeed.as_view(), name='index_rss'),
+    path('atom/', feeds.LatestPostsAtomFeed.as_view(), name='index_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/rss/', feeds.ProfilePostsFeed.as_view(),
+         name='profile_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.ProfilePostsAtomFeed.as_view(), name='profile_atom'),
+    path('profile/<str:username>/export/', views.profile_export,
+         name='profile_export'),
     path('group/<slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug>/rss/', feeds.GroupPostsFeed.as_view(),
+         name='group_rss'),
+    path('group/<slug>/atom/', feeds.GroupPostsAtomFeed.as_view(),
+         name='group_atom'),
+    path('group/<slug>/export/', views.group_export, name='group_export'),
+    path('search/', views.search, name='search'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('follow/', views.follow_index, name='follow_index'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
@@ -0,0 +1,24 @@
+from .models import Comment
+from .paginators import CursorPaginator
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+
+def get_page(request, paginator):
+    return paginator.get_cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        number=request.GET.get('page'),
+    )
+
+
+def paginate(request, queryset, per_page=POSTS_PER_PAGE, **kwargs):
+    return get_page(request, CursorPaginator(queryset, per_page, **kwargs))
+
+
+def comments_paginator(post_id, per_page=COMMENTS_PER_PAGE):
+    return CursorPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        per_page, ordering='created',
+    )
@@ -1,28 +1,41 @@
+from functools import partial
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition
 
+from . import export, thumbnails, writer
+from .cache import cache_page_versioned, post_etag, post_last_modified
+from .counters import cached_count
+from .feed import feed_paginator
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .search import SearchPaginator
+from .utils import POSTS_PER_PAGE, comments_paginator, get_page, paginate
 
 
+@cache_page_versioned('global')
 def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.select_related('author', 'group')
+    page_obj = paginate(request, posts, estimated=True, counter=partial(
+        cached_count, 'global', Post.objects.all(), estimate=True
+    ))
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@cache_page_versioned('group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.filter(group=group).select_related(
+        'author', 'group'
+    )
+    page_obj = paginate(request, posts, counter=partial(
+        cached_count, f'group:{slug}', Post.objects.filter(group=group)
+    ))
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -30,38 +43,81 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_page_versioned('author:{username}')
 def profile(request, username):
-    author = User.objects.get(username=username)
-    posts = Post.objects.filter(author=author)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    posts = Post.objects.filter(author=author).select_related(
+        'author', 'group'
+    )
+    page_obj = paginate(
+        request, posts, counter=lambda: author.stats.posts_count
+    )
     following = request.user.is_authenticated and Follow.objects.filter(
         author=author, user=request.user
     ).exists()
     context = {
         'username': username,
         'page_obj': page_obj,
-        'count': posts.count(),
+        'count': author.stats.posts_count,
         'author': author,
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return export.streaming_response(
+        request, Post.objects.filter(author=author), username
+    )
+
+
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return export.streaming_response(
+        request, Post.objects.filter(group=group), slug
+    )
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    context = {
+        'query': query,
+        'page_params': urlencode({'q': query}) + '&',
+        'page_obj': get_page(
+            request, SearchPaginator(query, POSTS_PER_PAGE)
+        ) if query else None,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, post_id):
-    post = Post.objects.filter(id=post_id).first()
-    posts = Post.objects.filter(author=post.author)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id
+    )
     context = {
         'post': post,
         'short_text': post.text[:30],
-        'count': posts.count(),
-        'comments': post.comments.all(),
+        'count': post.author.stats.posts_count,
+        'comments': comments_paginator(post.pk).first_page(),
         'form': PostForm()
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@condition(last_modified_func=post_last_modified)
+def post_comments(request, post_id):
+    """Later pages of comments, as an HTML fragment."""
+    context = {
+        'post_id': post_id,
+        'comments': get_page(request, comments_paginator(post_id)),
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
 
@@ -76,6 +132,8 @@ def post_create(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            if post.image:
+                thumbnails.schedule(post)
 
             return redirect('posts:profile', request.user)
 
@@ -86,7 +144,7 @@ def post_create(request):
 
 
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.select_related('author'), id=post_id)
 
     if post.author != request.user:
         return redirect('posts:post_detail', post.pk)
@@ -101,6 +159,9 @@ def post_edit(request, post_id):
 
         if form.is_valid():
             form.save()
+            if post.image and 'image' in form.changed_data:
+                thumbnails.schedule(post)
+            return redirect(f'/posts/{post_id}/')
         return redirect(f'/posts/{post_id}/')
 
     context = {
@@ -121,16 +182,15 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        writer.write(comment.save)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_page(
+        request, feed_paginator(request.user, POSTS_PER_PAGE)
+    )
     context = {
         'page_obj': page_obj,
     }
@@ -141,7 +201,8 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.create(
+        writer.write(
+            Follow.objects.get_or_create,
             user=request.user,
             author=author,
         )
@@ -154,10 +215,10 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(
+    writer.write(Follow.objects.filter(
         user=request.user,
         author=author,
-    ).delete()
+    ).delete)
     return redirect(
         'posts:profile',
         author.username
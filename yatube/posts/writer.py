@@ -0,0 +1,98 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue(settings.WRITE_QUEUE_SIZE)
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def _start():
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_run, name='writer', daemon=True
+            )
+            _thread.start()
+
+
+def _collect():
+    """The next job and those queued behind it while the last batch ran."""
+    jobs = [_queue.get()]
+    while len(jobs) < settings.WRITE_BATCH_SIZE:
+        try:
+            jobs.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return jobs
+
+
+def _commit(jobs):
+    results = []
+    try:
+        with transaction.atomic():
+            for future, function, args, kwargs in jobs:
+                # A failing job only rolls back its own savepoint.
+                try:
+                    with transaction.atomic():
+                        results.append(
+                            (future, function(*args, **kwargs), None)
+                        )
+                except Exception as error:
+                    results.append((future, None, error))
+    except Exception as error:
+        logger.exception('Batch of %s writes failed', len(jobs))
+        for future, *_ in jobs:
+            future.set_exception(error)
+        return
+    # Callers only hear back once their write is committed.
+    for future, result, error in results:
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+
+def _run():
+    while True:
+        jobs = [
+            job for job in _collect()
+            if job[0].set_running_or_notify_cancel()
+        ]
+        if jobs:
+            _commit(jobs)
+        close_old_connections()
+
+
+def write(function, *args, **kwargs):
+    """Run a small write and return its result once it is committed.
+
+    With ``WRITE_QUEUE`` on, the call goes to a single writer thread that
+    commits whatever has queued up meanwhile in one transaction, so
+    concurrent requests take the SQLite write lock once per batch rather
+    than once each. A call still queued after ``WRITE_QUEUE_TIMEOUT``
+    seconds, or one finding the queue full, is written by the caller.
+    """
+    if not settings.WRITE_QUEUE or connection.in_atomic_block:
+        return function(*args, **kwargs)
+    future = Future()
+    try:
+        _queue.put_nowait((future, function, args, kwargs))
+    except queue.Full:
+        return function(*args, **kwargs)
+    _start()
+    try:
+        return future.result(settings.WRITE_QUEUE_TIMEOUT)
+    except FutureTimeoutError:
+        if future.cancel():
+            return function(*args, **kwargs)
+        # Already part of a batch being committed.
+        return future.result()
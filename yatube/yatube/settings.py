@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -141,8 +142,61 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# One SQLite file in WAL mode shared by every worker process, so version
+# bumps and counters are seen by all of them.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'default.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'MAX_BYTES': 256 * 1024 * 1024,
+        },
     }
 }
+
+# Tests run on a cache file of their own, see core.testing.
+TEST_RUNNER = 'core.testing.TestRunner'
+
+# Anonymous list pages are cached for this long; writes bump their version.
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Post cards are keyed by post and author stamps, so they can live long.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Paginator counts are kept up to date by post signals and recounted
+# from scratch once this expires.
+PAGINATOR_COUNT_TIMEOUT = 60 * 60
+
+# Public JSON API responses may be reused by clients for this long and
+# revalidated with their ETag afterwards.
+API_CACHE_SECONDS = 60
+
+# Clients allowed to scrape the request histograms at /metrics.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Statements of a request slower than this are logged with their query
+# plan by a background writer; None turns the log off.
+SLOW_QUERY_SECONDS = 0.1
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'logs', 'slow_queries.log')
+SLOW_QUERY_LOG_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+# Records beyond this many waiting for the writer are dropped.
+SLOW_QUERY_QUEUE_SIZE = 1000
+
+# Authors with more followers than this are not fanned out to inboxes
+# and are merged into the follow feed at read time instead.
+FEED_FANOUT_LIMIT = 1000
+
+# Comments and follows can be handed to one writer thread that commits
+# them in batches. A request waits this many seconds for its batch before
+# writing by itself.
+WRITE_QUEUE = False
+WRITE_QUEUE_SIZE = 1000
+WRITE_QUEUE_TIMEOUT = 2
+WRITE_BATCH_SIZE = 100
+
+# Thumbnails rendered for every post image, generated ahead of time by a
+# bounded background pool after the post is saved.
+POST_THUMBNAILS = [
+    ('960x339', {'crop': 'center', 'upscale': True}),
+]
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_QUEUE_SIZE = 100
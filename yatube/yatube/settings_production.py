@@ -0,0 +1,39 @@
+"""Settings for serving Yatube from SQLite under concurrent load.
+
+Select with ``DJANGO_SETTINGS_MODULE=yatube.settings_production``.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'ENGINE': 'core.backends.sqlite3',
+        # Connections are kept between requests of a worker...
+        'CONN_MAX_AGE': 600,
+        # ...and checked with a SELECT 1 before they are reused.
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the lock before giving up.
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                # Readers no longer block the writer and the other way round.
+                'journal_mode': 'WAL',
+                # Safe with WAL; only the last commits may be lost on a
+                # power failure, never the database.
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+                'mmap_size': 256 * 1024 * 1024,
+                # Negative sizes are in KiB: 64 MiB of page cache.
+                'cache_size': -64 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
+    }
+}
+
+WRITE_QUEUE = True